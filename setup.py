@@ -15,6 +15,8 @@ setup(
     entry_points={
         "console_scripts": [
             "typeclipy = typeclipy.main:main",
+            "typeclipy-score = typeclipy.scoring:main",
+            "typeclipy-server = typeclipy.server:main",
         ],
     },
 )
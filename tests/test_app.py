@@ -0,0 +1,184 @@
+import asyncio
+import collections
+import curses
+import pytest
+
+from typeclipy.app import App
+from typeclipy.buffer import DELETE_WORD
+from typeclipy.events import Events
+
+# A stand-in for a curses window. Like on a real terminal, every window reads
+# keys from the same input.
+class FakeWindow:
+    def __init__(self, keys, height = 24, width = 80):
+        self.keys = keys
+        self.height = height
+        self.width = width
+
+    def get_wch(self):
+        if len(self.keys) == 0:
+            raise curses.error("no input")
+
+        return self.keys.popleft()
+
+    def getmaxyx(self):
+        return (self.height, self.width)
+
+    def getbegyx(self):
+        return (0, 0)
+
+    def derwin(self, height, width, y, x):
+        return FakeWindow(self.keys, height, width)
+
+    def resize(self, height, width):
+        self.height = height
+        self.width = width
+
+    # Drawing is left out
+    def __getattr__(self, name):
+        return lambda *args: None
+
+class FakeSession:
+    def __init__(self, keys):
+        self.stdscr = FakeWindow(keys)
+        self.colors = {"success": 1, "error": 2, "reverse": 3, "background": 4}
+        self.events = Events()
+        self.windows = (None, None, None, None)
+
+@pytest.fixture
+def keys(monkeypatch):
+    keys = collections.deque()
+
+    def resizeterm(lines, cols):
+        curses.LINES = lines
+        curses.COLS = cols
+
+    monkeypatch.setattr(curses, "LINES", 24, raising=False)
+    monkeypatch.setattr(curses, "COLS", 80, raising=False)
+    monkeypatch.setattr(curses, "resizeterm", resizeterm)
+    monkeypatch.setattr(curses, "newwin", lambda height, width, y, x: FakeWindow(keys, height, width))
+    monkeypatch.setattr(curses, "newpad", lambda height, width: FakeWindow(keys, height, width))
+
+    return keys
+
+# Runs `steps` with an app that has been set up like App.play does, without
+# waiting for the events it posts
+def with_app(keys, steps, text = "hello world", has_next = True):
+    async def run():
+        app = App(text, has_next=has_next, minimal=False)
+        app.setup(FakeSession(keys))
+        app.render()
+        app.start_test()
+
+        try:
+            return app, steps(app)
+        finally:
+            app.events.close()
+
+    return asyncio.run(run())
+
+def press(app, keys, typed):
+    keys.extend(typed)
+    return app.dispatch("input")
+
+class TestApp:
+    def test_play(self, keys):
+        async def run():
+            session = FakeSession(keys)
+            app = App("abc", has_next=True, minimal=False)
+            keys.extend("ax\x7fbc\n")
+            session.events.post("input")
+
+            try:
+                return app, await app.play(session)
+            finally:
+                session.events.close()
+
+        app, stop = asyncio.run(run())
+
+        assert stop is False
+        assert app.done
+        assert app.buffer.index == 3
+        assert app.buffer.miss_count == 1
+        assert [key for _, key in app.keystrokes] == ["a", "x", "\x7f", "b", "c"]
+
+    def test_keys(self, keys):
+        app, stop = with_app(keys, lambda app: press(app, keys, "helo"))
+
+        assert stop is None
+        assert app.buffer.index == 4
+        assert app.buffer.misses == [3]
+        assert app.missed == [3]
+        assert not app.waiting
+
+    def test_keys_are_drawn_in_one_frame(self, keys):
+        app, _ = with_app(keys, lambda app: press(app, keys, "hel"))
+
+        assert (app.frames, app.dropped_frames) == (1, 2)
+        assert not app.dirty
+
+    def test_frames_wait_for_pending_events(self, keys):
+        def steps(app):
+            keys.extend("he")
+            app.events.post("tick")
+            return app.dispatch("input")
+
+        app, _ = with_app(keys, steps)
+
+        assert app.frames == 0
+        assert app.dirty
+
+    def test_delete_word(self, keys):
+        app, _ = with_app(keys, lambda app: press(app, keys, ["h", "e", "l", "l", "o", " ", "w", "x", "\x1b", "\x7f"]))
+
+        assert app.buffer.index == 6
+        assert app.buffer.misses == []
+        assert [key for _, key in app.keystrokes][-1] == DELETE_WORD
+
+    def test_read_keys(self, keys):
+        def steps(app):
+            keys.extend(["a", "\x1b", "\x7f", "b", "\x1b"])
+            return app.read_keys()
+
+        _, sequences = with_app(keys, steps)
+
+        assert sequences == [["a"], ["\x1b", "\x7f"], ["b"], ["\x1b"]]
+
+    def test_menu(self, keys):
+        def steps(app):
+            finished = press(app, keys, "abc")
+            return finished, app.menu_options, press(app, keys, "j"), press(app, keys, "\n")
+
+        app, (finished, options, moved, selected) = with_app(keys, steps, text="abc")
+
+        assert finished is None
+        assert options == ["Next", "Exit", "Retry"]
+        assert moved is None
+        assert selected is True
+
+    def test_last_test_menu(self, keys):
+        app, selected = with_app(keys, lambda app: press(app, keys, "abc\n"), text="abc", has_next=False)
+
+        assert selected is True
+
+    def test_retry(self, keys):
+        def steps(app):
+            press(app, keys, "axc")
+            return press(app, keys, "jj\n")
+
+        app, selected = with_app(keys, steps, text="abc")
+
+        assert selected is None
+        assert not app.done
+        assert app.waiting
+        assert (app.buffer.index, app.buffer.misses) == (0, [])
+        assert app.keystrokes == []
+
+    def test_minimal_goes_to_the_next_test(self, keys):
+        def steps(app):
+            app.minimal = True
+            return press(app, keys, "abc")
+
+        app, selected = with_app(keys, steps, text="abc")
+
+        assert selected is False
@@ -144,3 +144,17 @@ class TestBuffer:
         buf.delete_word()
         assert buf.position()[1] == 0
 
+    def test_without_layout(self):
+        text = "Hello  World\nWith line\nbreaks "
+        laid_out = Buffer(text, 80)
+        buf = Buffer(text, None)
+
+        assert buf.layout is None
+        assert [buf.word_bounds(idx) for idx in range(len(text))] == [laid_out.word_bounds(idx) for idx in range(len(text))]
+
+        for c in "Hello  Wx":
+            buf.compute(c)
+
+        buf.delete_word()
+        assert buf.index == 7
+        assert buf.misses == []
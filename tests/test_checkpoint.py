@@ -0,0 +1,100 @@
+import pytest
+
+from typeclipy import checkpoint
+from typeclipy.buffer import Buffer
+from typeclipy.checkpoint import Checkpoint, miss_bitmap, misses_from_bitmap
+from typeclipy.layout import ARRAYS, fingerprint, layouts
+
+TEXT = "def main():\n    print('hello world')\n    return 0\n" * 20
+
+def saved_buffer():
+    buffer = Buffer(TEXT, 20, leading_spaces=True)
+
+    for _ in range(30):
+        buffer.compute(TEXT[buffer.index])
+
+    buffer.compute("x")
+    buffer.compute("y")
+
+    return buffer
+
+def save(buffer, colors = b""):
+    return Checkpoint(fingerprint(TEXT), len(TEXT), buffer.width, True, buffer.index, buffer.misses, buffer.miss_count, buffer.typed, 12.5, buffer.layout, colors)
+
+class TestCheckpoint:
+    def test_miss_bitmap(self):
+        misses = [0, 7, 8, 9, 1000]
+        assert misses_from_bitmap(miss_bitmap(misses, 1001)) == misses
+        assert misses_from_bitmap(miss_bitmap([], 10)) == []
+
+    def test_write_and_read(self, tmp_path):
+        buffer = saved_buffer()
+        path = tmp_path / "test.ckpt"
+        checkpoint.write(path, save(buffer, bytes(range(13)) * 10))
+        restored = checkpoint.read(path)
+
+        assert restored.matches(TEXT)
+        assert not restored.matches(TEXT + " ")
+        assert (restored.index, restored.misses, restored.miss_count, restored.typed) == (buffer.index, buffer.misses, 2, buffer.typed)
+        assert (restored.width, restored.leading_spaces, restored.elapsed) == (20, True, 12.5)
+        assert restored.colors == bytes(range(13)) * 10
+
+        for name in ARRAYS:
+            assert restored.layout[name] == getattr(buffer.layout, name)
+
+    def test_cache_layout(self, tmp_path):
+        buffer = saved_buffer()
+        path = tmp_path / "test.ckpt"
+        checkpoint.write(path, save(buffer))
+
+        layouts.clear()
+        restored = checkpoint.read(path)
+        restored.cache_layout(TEXT)
+        layout = layouts.get(TEXT, 20, True)
+
+        assert layout is restored.layout
+        assert layout.rendered_text == buffer.layout.rendered_text
+
+    def test_without_layout(self, tmp_path):
+        buffer = saved_buffer()
+        saved = save(buffer)
+        saved.layout = None
+        checkpoint.write(tmp_path / "test.ckpt", saved)
+
+        restored = checkpoint.read(tmp_path / "test.ckpt")
+        restored.cache_layout(TEXT)
+
+        assert restored.layout is None
+        assert restored.index == buffer.index
+
+    def test_not_a_checkpoint(self, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_text("Hello world, this is not a checkpoint at all")
+
+        with pytest.raises(ValueError):
+            checkpoint.read(path)
+
+    def test_damaged(self, tmp_path):
+        path = tmp_path / "test.ckpt"
+        checkpoint.write(path, save(saved_buffer()))
+        data = path.read_bytes()
+        path.write_bytes(data[:checkpoint.HEADER.size + 20])
+
+        with pytest.raises(ValueError):
+            checkpoint.read(path)
+
+    def test_finished_text(self, tmp_path):
+        saved = save(saved_buffer())
+        saved.index = len(TEXT)
+        checkpoint.write(tmp_path / "test.ckpt", saved)
+
+        with pytest.raises(ValueError):
+            checkpoint.read(tmp_path / "test.ckpt")
+
+    def test_remove(self, tmp_path):
+        path = tmp_path / "test.ckpt"
+        checkpoint.write(path, save(saved_buffer()))
+        checkpoint.remove(path)
+        checkpoint.remove(path)
+
+        assert not path.exists()
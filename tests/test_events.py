@@ -0,0 +1,52 @@
+import asyncio
+import os
+
+from typeclipy.events import Events
+
+class TestEvents:
+    def test_events_are_handled_in_order(self):
+        async def run():
+            events = Events()
+            events.post("input", 1)
+            events.post("tick")
+            events.post("input", 2)
+            return [await events.get() for _ in range(3)]
+
+        assert asyncio.run(run()) == [("input", 1), ("tick", None), ("input", 2)]
+
+    def test_every(self):
+        async def run():
+            events = Events()
+            events.every(0.01, "tick")
+            received = [await events.get() for _ in range(3)]
+            events.close()
+            return received
+
+        assert asyncio.run(run()) == [("tick", None)] * 3
+
+    def test_close_cancels_timers(self):
+        async def run():
+            events = Events()
+            task = events.every(0.01, "tick")
+            events.close()
+            await asyncio.sleep(0.05)
+            return task.cancelled(), events.tasks
+
+        assert asyncio.run(run()) == (True, [])
+
+    def test_add_reader(self):
+        read_fd, write_fd = os.pipe()
+
+        async def run():
+            events = Events()
+            events.add_reader(read_fd, "input")
+            os.write(write_fd, b"a")
+            event = await events.get()
+            events.close()
+            return event
+
+        try:
+            assert asyncio.run(run()) == ("input", None)
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
@@ -0,0 +1,83 @@
+from typeclipy.buffer import Buffer
+from typeclipy.layout import ARRAYS, Layout, LayoutCache, layouts, fingerprint
+
+class TestLayout:
+    def test_layout(self):
+        layout = Layout("Hello World, this example has a very long line", 20)
+        assert layout.rendered_text == "Hello World, this\nexample has a very\nlong line"
+        assert layout.line_count() == 3
+        assert layout.position(21) == (1, 3)
+        assert layout.line_of(21) == 1
+        assert layout.word_bounds(21) == (18, 24)
+        assert layout.word_bounds(5) == (0, 11)
+
+    def test_fingerprint(self):
+        assert fingerprint("Hello") == fingerprint("Hello")
+        assert fingerprint("Hello") != fingerprint("Hello ")
+
+    def test_cache_reuses_layouts(self):
+        cache = LayoutCache()
+        layout = cache.get("Hello World", 20)
+        assert cache.get("Hello World", 20) is layout
+        assert cache.get("Hello World", 30) is not layout
+        assert cache.get("Hello World", 20, True) is not layout
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = LayoutCache(max_chars=10)
+        first = cache.get("first", 20)
+        second = cache.get("secnd", 20)
+        cache.get("first", 20)
+        cache.get("third", 20)
+
+        assert cache.get("first", 20) is first
+        assert cache.get("secnd", 20) is not second
+        assert len(cache.layouts) == 2
+        assert cache.chars == 10
+
+    def test_cache_is_bounded_by_characters(self):
+        cache = LayoutCache(max_chars=100)
+        text = "word " * 30
+
+        for width in range(20, 40):
+            cache.get(text, width)
+
+        # Larger than the limit on its own, but the newest layout is kept
+        assert len(cache.layouts) == 1
+        assert cache.chars == len(text)
+
+        cache.get("small", 20)
+        assert len(cache.layouts) == 1
+        assert cache.chars == 5
+
+    def test_buffer_reset_keeps_layout(self):
+        buf = Buffer("Hello World", 80)
+        layout = buf.layout
+        buf.compute("H")
+        buf.compute("x")
+        buf.reset()
+
+        assert buf.layout is layout
+        assert buf.index == 0
+        assert buf.misses == []
+        assert buf.miss_count == 0
+        assert buf.typed == 0
+        assert buf.highlighted == (0, 4)
+
+    def test_buffer_resize_back_reuses_layout(self):
+        layouts.clear()
+        buf = Buffer("Hello World, this example has a very long line", 20, 30, 21)
+        layout = buf.layout
+        buf.resize(80, 30)
+        assert buf.position() == (0, 21)
+
+        buf.resize(20, 30)
+        assert buf.layout is layout
+        assert buf.position() == (1, 3)
+
+    def test_saved_arrays(self):
+        text = "def main():\n    print('hello world')\n" * 10
+        layout = Layout(text, 12)
+        restored = Layout(text, 12, {name: getattr(layout, name) for name in ARRAYS})
+
+        assert restored.rendered_text == layout.rendered_text
+        assert restored.position(40) == layout.position(40)
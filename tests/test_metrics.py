@@ -0,0 +1,59 @@
+from typeclipy import metrics
+from typeclipy.metrics import LiveMetrics
+
+class TestMetrics:
+    def test_wpm(self):
+        assert metrics.wpm(50, 60) == 10
+        assert metrics.wpm(50, 0) == 0
+
+    def test_accuracy(self):
+        assert metrics.accuracy(10, 1) == 90.0
+        assert metrics.accuracy(0, 0) is None
+
+class TestLiveMetrics:
+    def test_wpm_before_window_is_full(self):
+        live = LiveMetrics(window=10)
+        for i in range(11):
+            live.record(100 + i * 0.5, True)
+
+        # 11 keys over 5 seconds
+        assert live.wpm(105) == metrics.wpm(11, 5)
+        assert live.peak is None
+
+    def test_wpm_only_counts_the_window(self):
+        live = LiveMetrics(window=10)
+
+        # Slow for 20 seconds, then fast for 10 seconds
+        for i in range(20):
+            live.record(i, True)
+        for i in range(100):
+            live.record(20 + i * 0.1, True)
+
+        assert live.wpm(29.95) == metrics.wpm(100, 10)
+        assert live.peak == metrics.wpm(100, 10)
+
+    def test_window_empties_after_a_pause(self):
+        live = LiveMetrics(window=10)
+        live.record(0, True)
+        live.record(1, True)
+        assert live.wpm(30) == 0
+
+        live.record(31, True)
+        assert live.wpm(31) == metrics.wpm(1, 10)
+
+    def test_instant_wpm(self):
+        live = LiveMetrics()
+        live.record(0, True)
+        live.record(0.1, True)
+        assert live.instant_wpm() == 120
+
+        live.record(0.3, True)
+        assert live.instant_wpm() == int(120 + 0.3 * (60 - 120))
+
+    def test_accuracy(self):
+        live = LiveMetrics()
+        assert live.accuracy() is None
+
+        live.record(0, True)
+        live.record(1, False)
+        assert live.accuracy() == 50.0
@@ -0,0 +1,59 @@
+import random
+
+from collections import Counter
+from typeclipy.ngrams import NgramIndex, ngrams, missed_bigrams, drill
+from typeclipy.sources import drill_exercises, load_word_index, load_word_list
+
+class TestNgrams:
+    def test_ngrams(self):
+        assert ngrams("hello", 2) == {"he", "el", "ll", "lo"}
+        assert ngrams("hello", 3) == {"hel", "ell", "llo"}
+        assert ngrams("a", 2) == set()
+
+    def test_index(self):
+        index = NgramIndex(["the", "then", "other", "Thin", "a"])
+
+        assert index.words_with("th") == ["the", "then", "other", "Thin"]
+        assert index.words_with("the") == ["the", "then", "other"]
+        assert index.words_with("TH") == ["the", "then", "other", "Thin"]
+        assert index.words_with("qu") == []
+
+    def test_words_are_posted_once(self):
+        index = NgramIndex(["banana"])
+
+        assert list(index.word_ids("an")) == [0]
+        assert list(index.word_ids("ana")) == [0]
+
+    def test_missed_bigrams(self):
+        text = "the quick fox"
+
+        # t (no previous character), q (after a space), u and x
+        assert missed_bigrams(text, [0, 4, 5, 12, 12]) == Counter({"qu": 1, "ox": 2})
+
+    def test_drill(self):
+        random.seed(0)
+        index = NgramIndex(["fox", "quick", "queen", "brown", "dog"])
+        words = drill(index, Counter({"qu": 3, "zz": 10}), 50)
+
+        assert len(words) == 50
+        assert set(words) == {"quick", "queen"}
+
+    def test_drill_without_misses(self):
+        random.seed(0)
+        index = NgramIndex(["fox", "quick", "dog"])
+
+        assert set(drill(index, Counter(), 50)) == {"fox", "quick", "dog"}
+
+    def test_word_index_is_cached(self):
+        assert load_word_index("en") is load_word_index("en")
+        assert load_word_index("en").words is load_word_list("en")
+
+    def test_drill_exercises_follow_misses(self):
+        random.seed(0)
+        misses = Counter()
+        exercises = list(drill_exercises("en", misses, count=2))
+
+        exercises[0].load()
+        misses["xp"] += 1
+
+        assert all("xp" in word for word in exercises[1].load().split(" "))
@@ -0,0 +1,44 @@
+import json
+
+from typeclipy.scoring import score, score_line, score_all, read_lines
+
+class TestScoring:
+    def test_score(self):
+        session = {"text": "Hello", "keys": [[0, "H"], [0.1, "x"], [0.2, "\x7f"], [0.3, "e"], [0.4, "l"], [0.5, "l"], [0.6, "o"]]}
+        result = score(session)
+        assert result["completed"]
+        assert result["time"] == 0.6
+        assert result["wpm"] == int(6 / 5 / (0.6 / 60))
+        assert result["accuracy"] == 80.0
+
+    def test_score_delete_word(self):
+        session = {"text": "Hello World", "keys": [[0, "H"], [0.1, "x"], [0.2, "\x1b\x7f"], [0.3, "H"]]}
+        result = score(session)
+        assert not result["completed"]
+        assert result["accuracy"] == 0.0
+
+    def test_score_special_keys_are_misses(self):
+        result = score({"text": "<", "keys": [[0, "<258>"]]})
+        assert result["accuracy"] == 0.0
+
+    def test_score_without_keys(self):
+        result = score({"text": "Hello", "keys": []})
+        assert result == {"wpm": 0, "accuracy": None, "time": 0, "completed": False}
+
+    def test_score_line(self):
+        line = json.dumps({"id": "abc", "text": "a", "keys": [[0, "a"]]})
+        assert score_line((3, line))["id"] == "abc"
+        assert score_line((3, "not json")) == {"id": 3, "error": "Expecting value: line 1 column 1 (char 0)"}
+        assert score_line((4, "[1, 2]")) == {"id": 4, "error": "A session must be a JSON object"}
+        assert score_line((5, '"x"'))["id"] == 5
+        assert score_line((6, json.dumps({"text": 5, "keys": []}))) == {"id": 6, "error": "The text must be a string"}
+
+    def test_score_all_in_parallel(self, tmp_path):
+        path = tmp_path / "sessions.jsonl"
+        session = {"text": "ab", "keys": [[0, "a"], [1.0, "b"]]}
+        path.write_text("\n".join(json.dumps(session) for _ in range(20)) + "\n\n")
+
+        results = list(score_all(read_lines([str(path)]), jobs=2, chunksize=3))
+        assert [r["id"] for r in results] == list(range(20))
+        assert all(r["wpm"] == 24 for r in results)
+        assert results == list(score_all(read_lines([str(path)]), jobs=1))
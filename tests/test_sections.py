@@ -0,0 +1,55 @@
+from typeclipy import sections
+from typeclipy.sections import section_index
+
+SOURCE = """import os
+
+@decorator
+def first():
+    return 1
+
+class Second:
+    # A comment
+    def method(self):
+        pass
+
+    def other(self):
+        def inner():
+            pass
+        return inner
+"""
+
+class TestSections:
+    def test_section_index(self):
+        index = section_index("py", SOURCE)
+        assert [s.name for s in index] == ["first", "Second"]
+        assert SOURCE[index[0].start:index[0].end].startswith("import os\n\n@decorator\ndef first")
+        assert index[1].line == 6
+        assert index[1].end == len(SOURCE)
+        assert sum(s.size for s in index) == len(SOURCE)
+
+    def test_long_preamble(self):
+        imports = "".join(f"import m{n}\n" for n in range(sections.MIN_SECTION_LINES))
+        index = section_index("py", imports + SOURCE)
+        assert [s.name for s in index] == ["<module>", "first", "Second"]
+        assert index[1].line == sections.MIN_SECTION_LINES + 2
+
+    def test_split_large_classes(self, monkeypatch):
+        monkeypatch.setattr(sections, "MAX_SECTION_LINES", 3)
+        index = section_index("py", SOURCE)
+        assert [s.name for s in index] == ["first", "Second.method", "Second.other"]
+
+        # The class header is typed with the first method
+        assert SOURCE[index[1].start:index[1].end].startswith("class Second:\n    # A comment\n    def method")
+
+    def test_keyword_definitions(self):
+        text = "function a() {\n  return 1\n}\n\nfunction b() {}\n"
+        index = section_index("js", text)
+        assert [s.name for s in index] == ["a", "b"]
+
+    def test_exported_definitions(self):
+        text = "export function a() {\n  return 1\n}\n\nexport default async function b() {}\n\nexport class C {}\n"
+        index = section_index("js", text)
+        assert [s.name for s in index] == ["a", "b", "C"]
+
+    def test_unknown_file_type(self):
+        assert section_index("txt", "Hello World") == []
@@ -0,0 +1,238 @@
+import asyncio
+import contextlib
+import json
+import pytest
+import socket
+import threading
+
+from typeclipy import client, server
+from typeclipy.client import Connection, ServerError
+from typeclipy.server import Server
+
+# A stand-in for a terminal: talks to the server with the same messages as
+# typeclipy --connect, without curses.
+class FakeClient:
+    async def connect(self, path):
+        self.reader, self.writer = await asyncio.open_unix_connection(path)
+
+    async def request(self, **message):
+        self.writer.write(json.dumps(message).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        return json.loads(await self.reader.readline())
+
+    def send(self, **message):
+        self.writer.write(json.dumps(message).encode("utf-8") + b"\n")
+
+    async def type(self, keys):
+        for key in keys[:-1]:
+            self.send(op="key", key=key)
+
+        return await self.request(op="key", key=keys[-1])
+
+    def close(self):
+        self.writer.close()
+
+def serve(path, client_session):
+    async def run():
+        server = Server(str(path))
+        await server.start()
+
+        try:
+            return server, await client_session(server)
+        finally:
+            await server.close()
+
+    return asyncio.run(run())
+
+class TestServer:
+    def test_uploaded_text(self, tmp_path):
+        async def session(server):
+            client = FakeClient()
+            await client.connect(server.path)
+            exercise = await client.request(op="exercise", text="hello world", user="ana")
+            result = await client.type(list("hellp world"))
+            client.close()
+            return exercise, result
+
+        server, (exercise, result) = serve(tmp_path / "s.sock", session)
+
+        assert exercise == {"op": "exercise", "id": 1, "text": "hello world"}
+        assert result["op"] == "result"
+        assert result["user"] == "ana"
+        assert result["accuracy"] == 90.91
+        assert result["completed"]
+        assert [r["id"] for r in server.results] == [1]
+
+    def test_word_list(self, tmp_path):
+        async def session(server):
+            client = FakeClient()
+            await client.connect(server.path)
+            exercise = await client.request(op="exercise", lang="pt")
+            result = await client.type(list(exercise["text"]))
+            client.close()
+            return result
+
+        server, result = serve(tmp_path / "s.sock", session)
+
+        assert result["accuracy"] == 100.0
+
+    def test_retry(self, tmp_path):
+        async def session(server):
+            client = FakeClient()
+            await client.connect(server.path)
+            await client.request(op="exercise", text="abc")
+            client.send(op="key", key="x")
+            client.send(op="retry")
+            result = await client.type(list("abc"))
+            client.close()
+            return result
+
+        server, result = serve(tmp_path / "s.sock", session)
+
+        assert result["accuracy"] == 100.0
+
+    def test_errors(self, tmp_path):
+        async def session(server):
+            client = FakeClient()
+            await client.connect(server.path)
+            replies = [
+                await client.request(op="key", key="a"),
+                await client.request(op="exercise", lang="../../etc/passwd"),
+                await client.request(op="dance"),
+                await client.request(op="exercise", text=""),
+            ]
+            client.writer.write(b"not json\n")
+            replies.append(json.loads(await client.reader.readline()))
+            client.close()
+            return replies
+
+        server, replies = serve(tmp_path / "s.sock", session)
+
+        assert [reply["op"] for reply in replies] == ["error"] * 5
+        assert server.results == []
+
+    def test_concurrent_sessions(self, tmp_path):
+        async def typist(server, number):
+            client = FakeClient()
+            await client.connect(server.path)
+            text = f"session {number} types this text"
+            await client.request(op="exercise", text=text, user=str(number))
+            result = await client.type(list(text))
+            client.close()
+            return result
+
+        async def session(server):
+            return await asyncio.gather(*[typist(server, n) for n in range(200)])
+
+        server, results = serve(tmp_path / "s.sock", session)
+
+        assert len(server.results) == 200
+        assert sorted(r["user"] for r in results) == sorted(str(n) for n in range(200))
+        assert all(r["accuracy"] == 100.0 for r in results)
+
+    def test_blocking_client(self, tmp_path):
+        path = str(tmp_path / "s.sock")
+
+        with threaded_server(path):
+            connection = Connection(path, user="ana")
+            exercises = list(connection.exercises(None, "en"))
+            text = exercises[0].load()
+
+            for key in text:
+                connection.send_key(key)
+
+            result = connection.result()
+
+            try:
+                connection.exercise(lang="xx")
+                error = None
+            except ServerError as err:
+                error = err
+
+            connection.close()
+
+        assert len(exercises) == 20
+        assert result["accuracy"] == 100.0
+        assert result["user"] == "ana"
+        assert str(error) == "Unknown language: xx"
+
+    def test_blocking_client_without_server_result(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "s.sock")
+        monkeypatch.setattr(server, "MAX_MESSAGE_SIZE", 1024)
+
+        with threaded_server(path):
+            connection = Connection(path)
+            text = connection.upload("a" * 2000, False)
+
+            # The server refused the text and closed the connection
+            for key in text:
+                connection.send_key(key)
+
+            with pytest.raises(client.ERRORS):
+                connection.result()
+
+            connection.close()
+
+        assert text == "a" * 2000
+        assert not connection.scoring
+
+    def test_blocking_client_keeps_long_texts_local(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "s.sock")
+        monkeypatch.setattr(client, "MAX_MESSAGE_SIZE", 1024)
+
+        with threaded_server(path):
+            connection = Connection(path)
+            long_text = connection.upload("a" * 2000, False)
+            scoring_long_text = connection.scoring
+            text = connection.upload("abc", False)
+
+            for key in text:
+                connection.send_key(key)
+
+            result = connection.result()
+            connection.close()
+
+        assert long_text == "a" * 2000
+        assert not scoring_long_text
+        assert result["accuracy"] == 100.0
+
+    def test_blocking_client_times_out(self, tmp_path):
+        path = str(tmp_path / "s.sock")
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen()
+
+        # Connections are never accepted, so nothing is ever answered
+        connection = Connection(path, timeout=0.1)
+        exercises = list(connection.exercises(None, "en"))
+
+        assert len(exercises[0].load().split(" ")) > 1
+        assert not connection.scoring
+
+        connection.close()
+        listener.close()
+
+@contextlib.contextmanager
+def threaded_server(path):
+    started = threading.Event()
+    stop = threading.Event()
+
+    async def run():
+        server = Server(path)
+        await server.start()
+        started.set()
+
+        while not stop.is_set():
+            await asyncio.sleep(0.01)
+
+        await server.close()
+
+    thread = threading.Thread(target=asyncio.run, args=(run(),))
+    thread.start()
+    started.wait()
+
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,197 @@
+import io
+import os
+import threading
+import time
+
+from typeclipy.sources import Stream, missing_paths, with_has_next, pick_words, file_exercises, text_exercises, stream_exercises, word_exercises, DEFAULT_WORD_LIST_LENGTH
+
+class TestSources:
+    def test_with_has_next(self):
+        assert list(with_has_next([1, 2, 3])) == [(1, True), (2, True), (3, False)]
+        assert list(with_has_next([])) == []
+
+    def test_with_has_next_is_lazy(self):
+        loaded = []
+
+        def exercises():
+            for i in range(1000):
+                loaded.append(i)
+                yield i
+
+        for item, has_next in with_has_next(exercises()):
+            break
+
+        assert loaded == [0, 1]
+
+    def test_text_exercises(self):
+        exercises = list(text_exercises(["Hello", "World"]))
+        assert [e.load() for e in exercises] == ["Hello", "World"]
+        assert [e.file_type for e in exercises] == ["txt", "txt"]
+
+    def test_file_exercises_expand_directories(self, tmp_path):
+        (tmp_path / "b.py").write_text("print('b')\n")
+        (tmp_path / "a.txt").write_text("Hello\n")
+
+        exercises = list(file_exercises([str(tmp_path)]))
+        assert [e.file_type for e in exercises] == ["txt", "py"]
+        assert exercises[0].load() == "Hello"
+
+    def test_file_exercises_skip_hidden_and_binary_files(self, tmp_path):
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+        (tmp_path / ".hidden.txt").write_text("Hidden\n")
+        (tmp_path / "image.png").write_bytes(b"\x89PNG\r\n\x1a\n\xff\xfe")
+        (tmp_path / "a.txt").write_text("Hello\n")
+
+        exercises = list(file_exercises([str(tmp_path)]))
+        assert [e.load() for e in exercises] == ["Hello", ""]
+        assert list(file_exercises([str(tmp_path / "image.png")], "sequential")) == []
+
+    def test_file_exercises_expand_globs(self, tmp_path):
+        (tmp_path / "a.py").write_text("a = 1")
+        (tmp_path / "b.txt").write_text("b")
+
+        exercises = list(file_exercises([str(tmp_path / "*.py")]))
+        assert len(exercises) == 1
+        assert exercises[0].load() == "a = 1"
+
+    def test_file_exercises_read_on_load(self, tmp_path):
+        path = tmp_path / "later.txt"
+        exercises = file_exercises([str(path)])
+        exercise = next(exercises)
+
+        path.write_text("Written after listing")
+        assert exercise.load() == "Written after listing"
+
+    def test_file_exercises_skip_missing_files(self, tmp_path):
+        (tmp_path / "a.txt").write_text("Hello")
+        (tmp_path / "dir").mkdir()
+
+        exercises = list(file_exercises([str(tmp_path / "a.txt"), str(tmp_path / "missing.txt")]))
+        assert [e.load() for e in exercises] == ["Hello", ""]
+        assert list(file_exercises([str(tmp_path / "missing.txt")], "sequential")) == []
+
+    def test_missing_paths(self, tmp_path):
+        (tmp_path / "a.txt").write_text("Hello")
+        (tmp_path / "dir").mkdir()
+        paths = [str(tmp_path / name) for name in ("a.txt", "missing.txt", "dir", "*.txt", "*.py", "dir/*")]
+
+        assert list(missing_paths(paths)) == [str(tmp_path / name) for name in ("missing.txt", "*.py", "dir/*")]
+
+    def test_word_exercises(self):
+        exercises = list(word_exercises("en", 3))
+        assert len(exercises) == 3
+        assert len(exercises[0].load().split(" ")) == DEFAULT_WORD_LIST_LENGTH + 1
+
+    def test_pick_words(self):
+        assert pick_words(["a"]) == " ".join(["a"] * (DEFAULT_WORD_LIST_LENGTH + 1))
+
+    def test_stream_chunks(self):
+        stream = Stream(io.StringIO("first line\nsecond line\nthird line\n"), chunk_size=20, idle_timeout=0.01)
+        assert stream.next_chunk() == "first line\nsecond line"
+        assert stream.next_chunk() == "third line"
+        assert stream.next_chunk() == ""
+        assert stream.exhausted()
+
+    def test_stream_does_not_wait_for_eof(self):
+        read_fd, write_fd = os.pipe()
+        writer = os.fdopen(write_fd, "w")
+        stream = Stream(os.fdopen(read_fd, "r"), idle_timeout=0.01)
+
+        writer.write("Hello World\n")
+        writer.flush()
+        assert stream.next_chunk() == "Hello World"
+        assert not stream.exhausted()
+
+        writer.close()
+        assert stream.next_chunk() == ""
+        assert stream.exhausted()
+
+    def test_stream_exercises_know_the_last_chunk(self):
+        exercises = with_has_next(stream_exercises(io.StringIO("Hello\n")))
+        assert [(e.load(), has_next) for e, has_next in exercises] == [("Hello", False)]
+
+        text = "".join(f"line {n}\n" for n in range(200))
+        exercises = list(with_has_next(stream_exercises(io.StringIO(text))))
+        assert len(exercises) > 1
+        assert [has_next for _, has_next in exercises] == [True] * (len(exercises) - 1) + [False]
+        assert "\n".join(e.load() for e, _ in exercises) == text.strip()
+
+    def test_stream_exercises_do_not_wait_for_a_quiet_producer(self):
+        read_fd, write_fd = os.pipe()
+        writer = os.fdopen(write_fd, "w")
+        writer.write("Hello\n")
+        writer.flush()
+
+        exercises = with_has_next(stream_exercises(os.fdopen(read_fd, "r"), timeout=0.05))
+        exercise, has_next = next(exercises)
+
+        assert exercise.load() == "Hello"
+        assert has_next
+
+        writer.write("World\n")
+        writer.close()
+        assert next(exercises)[0].load() == "World"
+
+    def test_stream_chunks_are_cut_in_time(self):
+        read_fd, write_fd = os.pipe()
+        writer = os.fdopen(write_fd, "w")
+        stop = threading.Event()
+
+        # Writes faster than the idle timeout, but never fills a chunk
+        def produce():
+            while not stop.is_set():
+                writer.write("word\n")
+                writer.flush()
+                time.sleep(0.02)
+
+        threading.Thread(target=produce, daemon=True).start()
+        stream = Stream(os.fdopen(read_fd, "r"), idle_timeout=0.1)
+        started = time.monotonic()
+        chunk = stream.next_chunk()
+        elapsed = time.monotonic() - started
+        stop.set()
+
+        assert chunk.startswith("word")
+        assert elapsed < 0.5
+
+    def test_stream_exercises_do_not_wait_for_the_next_chunk(self):
+        read_fd, write_fd = os.pipe()
+        writer = os.fdopen(write_fd, "w")
+        writer.write("Hello\n")
+        writer.flush()
+
+        exercises = with_has_next(stream_exercises(os.fdopen(read_fd, "r")))
+        exercise, has_next = next(exercises)
+        assert exercise.load() == "Hello"
+
+        # The next exercise is handed out without waiting for its text
+        started = time.monotonic()
+        exercise, _ = next(exercises)
+        assert time.monotonic() - started < 0.5
+
+        writer.write("World\n")
+        writer.close()
+        assert exercise.load() == "World"
+
+    def test_stream_exercises(self):
+        exercises = stream_exercises(io.StringIO("Hello\n"))
+        assert next(exercises).load() == "Hello"
+
+    def test_section_exercises(self, tmp_path):
+        (tmp_path / "code.py").write_text("def a():\n    pass\n\ndef b():\n    pass\n")
+        (tmp_path / "notes.txt").write_text("Hello")
+
+        exercises = list(file_exercises([str(tmp_path)], "sequential"))
+        assert [e.load() for e in exercises] == ["def a():\n    pass", "def b():\n    pass", "Hello"]
+        assert exercises[0].name.endswith("code.py:a")
+
+    def test_section_exercises_are_dedented(self, tmp_path):
+        methods = "".join(f"    def m{n}(self):\n        x = {n}\n        return x\n\n" for n in range(40))
+        (tmp_path / "big.py").write_text(f"class Big:\n{methods}")
+
+        exercises = list(file_exercises([str(tmp_path / "big.py")], "sequential"))
+        texts = [e.load() for e in exercises]
+
+        assert texts[0].startswith("class Big:\n    def m0(self):")
+        assert "def m1(self):\n    x = 1\n    return x" in texts
@@ -0,0 +1,57 @@
+from typeclipy.buffer import Buffer
+from typeclipy.typist import SyntheticTypist, BACKSPACE, DELETE_WORD
+
+def type_all(typist, buf, limit = 1000):
+    keystrokes = 0
+
+    while buf.index < len(buf.text) and keystrokes < limit:
+        seq = typist.next_keys(buf)
+
+        if seq == DELETE_WORD:
+            buf.delete_word()
+        else:
+            buf.compute(seq[0])
+
+        keystrokes += 1
+
+    return keystrokes
+
+class TestSyntheticTypist:
+    def test_interval(self):
+        assert SyntheticTypist(wpm=120).interval() == 0.1
+        assert SyntheticTypist(wpm=6000).interval() == 0.002
+
+    def test_burst_delay(self):
+        typist = SyntheticTypist(wpm=120, burst=(3, 1.0))
+        delays = [typist.delay() for _ in range(6)]
+        assert delays == [0.1, 0.1, 1.1, 0.1, 0.1, 1.1]
+
+    def test_types_expected_keys(self):
+        buf = Buffer("Hello World", 80)
+        assert type_all(SyntheticTypist(), buf) == len("Hello World")
+        assert buf.miss_count == 0
+
+    def test_corrects_errors_with_backspace(self):
+        buf = Buffer("Hello World", 80)
+        typist = SyntheticTypist(error_rate=1.0)
+        assert typist.next_keys(buf) != ["H"]
+        buf.compute("x")
+        assert typist.next_keys(buf) == BACKSPACE
+
+    def test_corrects_errors_with_word_delete(self):
+        buf = Buffer("Hello World", 80)
+        buf.compute("x")
+        assert SyntheticTypist(word_delete_rate=1.0).next_keys(buf) == DELETE_WORD
+
+    def test_leaves_errors_behind(self):
+        buf = Buffer("Hello World there", 80)
+        type_all(SyntheticTypist(error_rate=0.3, correction_rate=0.0, seed=1), buf)
+        assert buf.index == len(buf.text)
+        assert len(buf.misses) > 0
+
+    def test_finishes_with_corrections(self):
+        buf = Buffer("Hello World, this is a longer text", 80)
+        type_all(SyntheticTypist(error_rate=0.2, word_delete_rate=0.5, seed=2), buf)
+        assert buf.index == len(buf.text)
+        assert buf.misses == []
+        assert buf.miss_count > 0
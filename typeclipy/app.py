@@ -1,30 +1,44 @@
+import asyncio
 import curses
+import os
 import time
 import re
-import threading
-import signal
 import resource
 import sys
 
 from datetime import datetime
-from curses import wrapper
-from typeclipy.buffer import Buffer
+from typeclipy import client, metrics
+from typeclipy.buffer import Buffer, DELETE_WORD
+from typeclipy.checkpoint import Checkpoint
+from typeclipy.layout import fingerprint
+
+# Bytes written by this process so far, or None where /proc isn't available.
+# Only curses writes while a test is running, so this is what the terminal
+# received.
+def bytes_written():
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+
+    return None
 
 # TODO:
 # - Send results to logging directory
 
 class App:
-    def __init__(self, text, has_next, minimal, theme = None, screen_lock = threading.Lock(), color_list = [], leading_spaces = False, debug = False, autoplay = False):
+    def __init__(self, text, has_next, minimal, color_list = [], leading_spaces = False, debug = False, autoplay = None, low_bandwidth = False, remote = None, resume = None):
         self.text = text
         self.debug = debug
         self.autoplay = autoplay
         self.waiting = True
         self.done = False
-        self.screen_lock = screen_lock
         self.result_menu_option = 0
         self.has_next = has_next
         self.minimal = minimal
-        self.theme = theme
         self.color_list = color_list
         self.buffer = None
         self.outer = None
@@ -35,23 +49,36 @@ class App:
         self.end_time = None
         self.finished_at = None
         self.leading_spaces = leading_spaces
+        self.events = None
+        self.status_task = None
+        self.autoplay_task = None
+        self.dirty = False
+        self.frames = 0
+        self.dropped_frames = 0
+        self.keystrokes = []
+        self.missed = []
+        self.live = metrics.LiveMetrics()
+        self.low_bandwidth = low_bandwidth
+        self.painted = (0, (0, 0))
+        self.bytes_written = 0
+        self.keys_written = 0
+        self.remote = remote
+        self.remote_result = None
+        self.resume = resume
 
         self.menu_options = ["Exit", "Retry"]
         if self.has_next:
             self.menu_options.insert(0, "Next")
 
-    def setup(self, stdscr):
-        self.stdscr = stdscr
-        curses.noecho()
-        curses.cbreak()
-        stdscr.keypad(True)
-        curses.curs_set(0)
-        self.define_colors()
-        stdscr.bkgd(" ", self.colors["background"])
-        stdscr.clear()
-        stdscr.refresh()
+    # Curses and the colors are initialized once per session. Each test takes
+    # over the windows of the previous one instead of creating new ones.
+    def setup(self, session):
+        self.session = session
+        self.stdscr = session.stdscr
+        self.colors = session.colors
+        self.events = session.events
+        self.outer, self.win, self.status_bar, self.debug_window = session.windows
         self.set_dimensions()
-        signal.signal(signal.SIGWINCH, self.on_resize)
 
     def set_dimensions(self):
         self.scr_height, self.scr_width = self.stdscr.getmaxyx()
@@ -87,61 +114,34 @@ class App:
         # 1 for the top border, 1 for the bottom border, and 2 for the status bar.
         self.buffer_height = self.height - 4
 
-    def define_colors(self):
-        curses.start_color()
-
-        background = 235
-        success = 70
-        primary = 250
-        danger = 160
-
-        if self.theme == "warm_sunset":
-            background = 52
-            success = 142
-            primary = 223
-            danger = 203
-        elif self.theme == "ocean_breeze":
-            background = 17
-            success = 79
-            primary = 188
-            danger = 124
-        elif self.theme == "solarized_dark":
-            background = 235
-            success = 108
-            primary = 136
-            danger = 167
-        elif self.theme == "light_beige":
-            background = 230
-            success = 28
-            primary = 58
-            danger = 160
-
-        curses.init_pair(1, success, background)
-        curses.init_pair(2, primary, danger)
-        curses.init_pair(3, background, primary)
-        curses.init_pair(4, primary, background)
-
-        self.colors = {
-            "success": curses.color_pair(1),
-            "error": curses.color_pair(2),
-            "reverse": curses.color_pair(3),
-            "background": curses.color_pair(4)
-        }
+    def char_style(self, text_index, has_custom_color):
+        miss = text_index in self.buffer.misses
+        hit = text_index < self.buffer.index and not miss
+        typed = miss or hit
+        period_or_comma = re.match(r"[,.]$", self.buffer.text[text_index]) is not None
+        underlined = not typed and text_index >= self.buffer.highlighted[0] and text_index <= self.buffer.highlighted[1] and not period_or_comma
+
+        if miss:
+            return self.colors["error"]
+        elif hit:
+            return self.colors["success"]
+        elif underlined:
+            style = curses.A_UNDERLINE
+
+            if has_custom_color:
+                style = curses.A_UNDERLINE | curses.color_pair(self.color_list[text_index])
 
-        # Syntax highlighting
-        curses.init_pair(5, 12, background)
-        curses.init_pair(6, 10, background)
-        curses.init_pair(7, 13, background)
-        curses.init_pair(8, 14, background)
-        curses.init_pair(9, 9, background)
-        curses.init_pair(10, 3, background)
-        curses.init_pair(11, 5, background)
-        curses.init_pair(12, 51, background)
-
-    def teardown(self, stdscr):
-        curses.nocbreak()
-        stdscr.keypad(False)
-        curses.echo()
+            return style
+        elif has_custom_color:
+            return curses.color_pair(self.color_list[text_index])
+
+        return 0
+
+    def log_print_error(self, text, text_index):
+        error = f"Error trying to print character '{text}', index #{text_index}. Text around: '{self.buffer.rendered_text[text_index - 10:text_index + 10]}'"
+        buffer_info = f"self.buffer_width: {self.buffer_width}, self.buffer_height: {self.buffer_height}"
+        outer_info = f"self.width: {self.width}, self.height: {self.height}"
+        self.log(f"{error}\nbuffer:\t{buffer_info}\nouter:\t{outer_info}")
 
     def print_rendered_text(self, win):
         text_index = 0
@@ -150,38 +150,15 @@ class App:
         win.move(0, 0)
 
         while text_index < len(self.buffer.text):
-            miss = text_index in self.buffer.misses
-            hit = text_index < self.buffer.index and not miss
-            typed = miss or hit
-            period_or_comma = re.match(r"[,.]$", self.buffer.text[text_index]) is not None
-            underlined = not typed and text_index >= self.buffer.highlighted[0] and text_index <= self.buffer.highlighted[1] and not period_or_comma
-
             text = self.buffer.rendered_text[text_index]
 
             if self.buffer.text[text_index] == "\n":
                 text = "↵\n"
 
             try:
-                if miss:
-                    win.addstr(text, self.colors["error"])
-                elif hit:
-                    win.addstr(text, self.colors["success"])
-                elif underlined:
-                    style = curses.A_UNDERLINE
-
-                    if has_custom_color:
-                        style = curses.A_UNDERLINE | curses.color_pair(self.color_list[text_index])
-
-                    win.addstr(text, style)
-                elif has_custom_color:
-                    win.addstr(text, curses.color_pair(self.color_list[text_index]))
-                else:
-                    win.addstr(text)
+                win.addstr(text, self.char_style(text_index, has_custom_color))
             except Exception as e:
-                error = f"Error trying to print character '{text}', index #{text_index}. Text around: '{self.buffer.rendered_text[text_index - 10:text_index + 10]}'"
-                buffer_info = f"self.buffer_width: {self.buffer_width}, self.buffer_height: {self.buffer_height}"
-                outer_info = f"self.width: {self.width}, self.height: {self.height}"
-                self.log(f"{error}\nbuffer:\t{buffer_info}\nouter:\t{outer_info}")
+                self.log_print_error(text, text_index)
 
             text_index += 1
 
@@ -194,52 +171,109 @@ class App:
             else:
                 win.addstr(pos_y, pos_x, self.buffer.rendered_text[self.buffer.index], self.colors["reverse"])
 
-        win.refresh(self.buffer.scroll_pos(), 0, self.buffer_y, self.buffer_x, self.buffer_height + self.y, self.buffer_width + self.x)
+        self.painted = (self.buffer.index, self.buffer.highlighted)
+        self.refresh(win, self.buffer.scroll_pos(), 0, self.buffer_y, self.buffer_x, self.buffer_height + self.y, self.buffer_width + self.x)
+
+    # Low bandwidth mode: only repaints the characters that may have changed
+    # since the last frame. That is everything between the old and the new
+    # cursor (typed, deleted, skipped) and the old and new highlighted words.
+    def print_changed_text(self, win):
+        has_custom_color = len(self.color_list) > 0
+        painted_index, painted_highlight = self.painted
+        ranges = [
+            (min(painted_index, self.buffer.index), max(painted_index, self.buffer.index)),
+            painted_highlight,
+            self.buffer.highlighted
+        ]
+
+        for start, end in ranges:
+            for text_index in range(max(start, 0), min(end + 1, len(self.buffer.text))):
+                self.print_char(win, text_index, self.char_style(text_index, has_custom_color))
+
+        if self.buffer.index < len(self.buffer.text):
+            self.print_char(win, self.buffer.index, self.colors["reverse"])
+
+        self.painted = (self.buffer.index, self.buffer.highlighted)
+        self.refresh(win, self.buffer.scroll_pos(), 0, self.buffer_y, self.buffer_x, self.buffer_height + self.y, self.buffer_width + self.x)
+
+    def print_char(self, win, text_index, style):
+        (pos_y, pos_x) = self.buffer.layout.position(text_index)
+        text = self.buffer.rendered_text[text_index]
+
+        # Printing a line break would clear the rest of the line
+        if self.buffer.text[text_index] == "\n":
+            text = "↵"
+        elif text == "\n":
+            text = " "
+            style = style if style == self.colors["reverse"] else 0
+
+        try:
+            win.addstr(pos_y, pos_x, text, style)
+        except Exception as e:
+            self.log_print_error(text, text_index)
+
+    # Low bandwidth mode batches all window updates of an event in a single
+    # write to the terminal (see App.play)
+    def refresh(self, window, *args):
+        if self.low_bandwidth:
+            window.noutrefresh(*args)
+        else:
+            window.refresh(*args)
 
     def log(self, message):
         if self.debug:
-            with self.screen_lock:
-                self.debug_window.move(0, 0)
-                self.debug_window.deleteln()
-                self.debug_window.addstr(0, 0, message)
-                self.debug_window.refresh()
+            self.debug_window.move(0, 0)
+            self.debug_window.deleteln()
+            self.debug_window.addstr(0, 0, message)
+            self.debug_window.refresh()
 
+    # Share of the text typed right, like typeclipy-score and the server
     def accuracy(self):
-        if self.buffer.index > 0:
-            return f"{((1.0 - self.buffer.miss_count / self.buffer.index) * 100):.2f}%"
+        accuracy = metrics.accuracy(self.buffer.index, self.buffer.miss_count)
+
+        if accuracy is not None:
+            return f"{accuracy:.2f}%"
+        return ""
+
+    # Share of the keystrokes that were right: a key typed wrong, deleted and
+    # typed again counts once as a miss and once as a hit
+    def key_accuracy(self):
+        accuracy = self.live.accuracy()
+
+        if accuracy is not None:
+            return f"{accuracy:.2f}%"
         return ""
 
     def wpm(self, now):
-        duration_s = now - self.start_time
-        duration_min = duration_s / 60
-        return int(self.buffer.typed / 5 / duration_min)
+        return metrics.wpm(self.buffer.typed, now - self.start_time)
 
     def render_status_bar(self):
         self.status_bar.erase()
 
         if self.done:
-            self.status_bar.refresh()
+            self.refresh(self.status_bar)
             return
 
         if self.waiting:
             self.status_bar.addstr(0, 1, "Ready")
         else:
             now = time.perf_counter()
-            wpm = self.wpm(now)
+            wpm = self.live.wpm(now)
             wpm_s = "--"
 
             if wpm < 300:
                 wpm_s = f"{wpm}"
 
             self.status_bar.addstr(0, 1, f"WPM: {wpm_s}")
-            self.status_bar.addstr(0, int(self.buffer_width * 0.25), f"Time: {int(now - self.start_time)}s")
-            self.status_bar.addstr(0, int(self.buffer_width * 0.45), f"Accuracy: {self.accuracy()}")
+            self.status_bar.addstr(0, int(self.buffer_width * 0.15), f"Now: {self.live.instant_wpm()}")
+            self.status_bar.addstr(0, int(self.buffer_width * 0.3), f"Time: {int(now - self.start_time)}s")
+            self.status_bar.addstr(0, int(self.buffer_width * 0.45), f"Key accuracy: {self.key_accuracy()}")
 
             if self.autoplay:
                 self.status_bar.addstr(0, int(self.buffer_width * 0.8), f"Autoplay: ON")
 
-        self.status_bar.refresh()
-        self.outer.refresh()
+        self.refresh(self.status_bar)
+        self.refresh(self.outer)
 
     def result(self):
         result = ""
@@ -247,8 +281,15 @@ class App:
         duration_s = self.end_time - self.start_time
         duration_min = duration_s / 60
 
+        # The live figures go on the same lines, so that the menu still fits
+        # below the result
+        live = [f"last {self.live.window}s: {self.live.wpm(self.end_time)}", f"now: {self.live.instant_wpm()}"]
+
+        if self.live.peak is not None:
+            live.append(f"peak: {self.live.peak}")
+
         wpm = self.wpm(self.end_time)
-        result += f"WPM: {wpm:.0f}\n"
+        result += f"WPM: {wpm:.0f} ({', '.join(live)})\n"
 
         if duration_s > 60:
             rest = (duration_min - int(duration_min)) * 60
@@ -256,17 +297,77 @@ class App:
         else:
             result += f"Time: {duration_s:.2f}s\n"
 
-        result += f"Accuracy: {self.accuracy()}\n"
+        result += f"Accuracy: {self.accuracy()} (keys: {self.key_accuracy()})\n"
+
+        if self.remote_result is not None:
+            result += f"Server: {self.remote_result['wpm']:.0f} WPM, {self.remote_result['accuracy']}% accuracy\n"
+        elif self.remote is not None:
+            result += "Server: unavailable\n"
+
+        if self.autoplay:
+            result += f"FPS: {self.frames / duration_s:.0f} ({self.dropped_frames} dropped frames)\n"
 
         return result
 
     def render_result(self):
         self.result_win.addstr(0, 0, self.result())
 
+    # The keystrokes of the last attempt, in the format read by typeclipy-score
+    def recording(self):
+        start = self.keystrokes[0][0] if len(self.keystrokes) > 0 else 0
+
+        return {
+            "text": self.text,
+            "leading_spaces": self.leading_spaces,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "keys": [[round(t - start, 4), key] for t, key in self.keystrokes]
+        }
+
+    # Where the current test was left, or None if there is nothing to continue
+    def checkpoint(self):
+        if self.buffer is None or self.done:
+            return None
+
+        elapsed = 0 if self.waiting else time.perf_counter() - self.start_time
+
+        return Checkpoint(
+            fingerprint(self.text),
+            len(self.text),
+            self.buffer.width,
+            self.leading_spaces,
+            self.buffer.index,
+            self.buffer.misses,
+            self.buffer.miss_count,
+            self.buffer.typed,
+            elapsed,
+            self.buffer.layout,
+            bytes(self.color_list)
+        )
+
+    def restore(self, checkpoint):
+        self.buffer.index = checkpoint.index
+        self.buffer.misses = checkpoint.misses
+        self.buffer.miss_count = checkpoint.miss_count
+        self.buffer.typed = checkpoint.typed
+        self.buffer.highlight()
+
+        if checkpoint.index > 0:
+            self.start_time = time.perf_counter() - checkpoint.elapsed
+            self.waiting = False
+
     def report(self):
         date = self.finished_at.strftime("%Y-%m-%d %H:%M:%S %z")
         return f"{date}\n{self.result()}"
 
+    def update(self):
+        if self.low_bandwidth:
+            curses.doupdate()
+
+    def log_bytes_written(self, count):
+        if self.debug and count > 0:
+            self.bytes_written += count
+            self.log(f"Bytes written: {count} (avg. {self.bytes_written / max(self.keys_written, 1):.1f} per keystroke)")
+
     def log_memory_usage(self):
         usage = resource.getrusage(resource.RUSAGE_SELF)
         mem_kb = usage.ru_maxrss
@@ -279,33 +380,28 @@ class App:
         self.log(f"Memory usage: {mem_mb:.2f} MB")
 
     def render_result_menu(self):
-        while True:
-            menu_index = 0
-
-            for idx, option in enumerate(self.menu_options):
-                prefix = "›  " if idx == self.result_menu_option else "   "
-                text = f"{prefix}{option}".ljust(10)
-                color = self.colors["reverse"] if idx == self.result_menu_option else 0
-                self.result_win.addstr(5 + idx, 0, text, color)
-
-            self.result_win.refresh()
-            key = self.result_win.getch()
-
-            if key in (curses.KEY_DOWN, ord("j")) and self.result_menu_option < len(self.menu_options) - 1:
-                self.result_menu_option += 1
-
-            elif key in (curses.KEY_UP, ord("k")) and self.result_menu_option > 0:
-                self.result_menu_option -= 1
-
-            elif key in (curses.KEY_ENTER, 10, 13):
-                return
-
+        for idx, option in enumerate(self.menu_options):
+            prefix = "›  " if idx == self.result_menu_option else "   "
+            text = f"{prefix}{option}".ljust(10)
+            color = self.colors["reverse"] if idx == self.result_menu_option else 0
+            self.result_win.addstr(5 + idx, 0, text, color)
+
+        self.refresh(self.result_win)
+
+    def on_resize(self):
+        try:
+            if self.low_bandwidth:
+                # SIGWINCH is handled by the event queue instead of curses, so
+                # curses has to be told the new size. endwin() would do it too,
+                # but the next refresh would repaint the whole terminal.
+                size = os.get_terminal_size(sys.__stdout__.fileno())
+                curses.resizeterm(size.lines, size.columns)
+
+                # Let curses work out what changed instead of repainting
+                # the whole terminal
+                for window in (self.win, self.status_bar, self.outer, self.stdscr):
+                    window.erase()
             else:
-                continue
-
-    def on_resize(self, signum, frame):
-        with self.screen_lock:
-            try:
                 self.win.clear()
                 self.status_bar.clear()
                 if self.debug:
@@ -316,11 +412,18 @@ class App:
                 self.stdscr.clear()
                 curses.endwin()
                 self.stdscr.refresh()
-                self.set_dimensions()
 
-                self.render()
-            except Exception as err:
-                print(f"an error occurred when resizing the screen: {err}")
+            self.set_dimensions()
+
+            self.render()
+
+            if self.done:
+                if not self.minimal:
+                    self.render_result_menu()
+            else:
+                self.print_rendered_text(self.win)
+        except Exception as err:
+            self.log(f"an error occurred when resizing the screen: {err}")
 
     def render(self):
         if self.buffer != None:
@@ -335,46 +438,60 @@ class App:
         self.y = self.y + diff // 2
         self.buffer_y += diff // 2
 
-        if self.outer != None:
-            del self.outer
+        if self.outer == None or self.outer.getbegyx() != (self.y, self.x) or self.outer.getmaxyx() != (self.height, self.width):
+            # Blank what the previous box covered. Unlike clear(), erase()
+            # doesn't force the whole terminal to be repainted.
+            if self.outer != None:
+                self.stdscr.erase()
+                self.stdscr.noutrefresh()
 
-        self.outer = curses.newwin(self.height, self.width, self.y, self.x)
+            self.outer = curses.newwin(self.height, self.width, self.y, self.x)
+            self.outer.bkgd(" ", self.colors["background"])
 
-        self.outer.bkgd(" ", self.colors["background"])
-        self.outer.clear()
+        self.outer.erase()
         self.outer.box()
 
-        if self.win != None:
-            del self.win
+        if self.win == None:
+            self.win = curses.newpad(self.buffer.line_count(), self.buffer_width)
+            self.win.bkgd(" ", self.colors["background"])
+            self.win.nodelay(True)
+        else:
+            self.win.resize(self.buffer.line_count(), self.buffer_width)
 
-        self.win = curses.newpad(self.buffer.line_count(), self.buffer_width)
-        self.win.bkgd(" ", self.colors["background"])
-        self.win.clear()
+        # Scrolling can then be done by inserting and deleting lines, and the
+        # (hidden) terminal cursor is left wherever the last change was made
+        for window in (self.win, self.stdscr, self.outer):
+            window.idlok(self.low_bandwidth)
+            window.leaveok(self.low_bandwidth)
 
-        if self.status_bar != None:
-            del self.status_bar
+        self.win.erase()
 
         self.status_bar = self.outer.derwin(1, self.buffer_width + 2, self.buffer_height + 2, 1)
         self.status_bar.bkgd(" ", self.colors["reverse"])
 
         if self.debug:
-            if self.debug_window != None:
-                del self.debug_window
+            if self.debug_window == None:
+                self.debug_window = curses.newwin(6, curses.COLS, curses.LINES - 5, 0)
+            else:
+                self.debug_window.resize(6, curses.COLS)
+                self.debug_window.mvwin(curses.LINES - 5, 0)
 
-            self.debug_window = curses.newwin(6, curses.COLS, curses.LINES - 5, 0)
             self.debug_window.refresh()
 
-        self.outer.refresh()
+        self.refresh(self.outer)
 
         if self.done:
             if self.result_win != None:
                 del self.result_win
 
-            self.result_win = self.outer.derwin(self.buffer_height, self.buffer_width, 1, 2)
-            self.result_win.keypad(True)
-
+            self.create_result_win()
             self.render_result()
 
+    def create_result_win(self):
+        self.result_win = self.outer.derwin(self.buffer_height, self.buffer_width, 1, 2)
+        self.result_win.keypad(True)
+        self.result_win.nodelay(True)
+
     def create_buffer(self):
         self.buffer = Buffer(self.text, self.buffer_width, self.buffer_height, 0, self.leading_spaces)
 
@@ -387,104 +504,249 @@ class App:
         self.end_time = time.perf_counter()
         self.finished_at = datetime.now().astimezone()
 
-    def run(self, stdscr):
-        stop = False
+    def start_test(self):
+        self.print_rendered_text(self.win)
+        self.dirty = False
+        self.frames = 0
+        self.dropped_frames = 0
+        self.keystrokes = []
+        self.missed = []
+        self.live = metrics.LiveMetrics()
+        self.bytes_written = 0
+        self.keys_written = 0
 
-        self.setup(stdscr)
-        self.render()
-        self.log("Initialized application")
+        if not self.minimal:
+            self.status_task = self.events.every(1, "tick")
 
-        def update_status_bar():
-            while True:
-                with self.screen_lock:
-                    self.render_status_bar()
+        if self.autoplay:
+            self.autoplay.reset()
+            self.autoplay_task = self.events.spawn(self.type_automatically())
 
-                if self.done:
-                    break
+        self.win.move(0, 0)
 
-                time.sleep(1)
+    async def type_automatically(self):
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
 
-        # Retry loop. The user continues here if he chooses 'Retry' at the end
+        # Keystrokes follow a fixed schedule: after a slow frame, every key that
+        # is due is posted at once instead of slowing the typist down.
         while True:
-            self.print_rendered_text(self.win)
+            next_at += self.autoplay.delay()
+            now = loop.time()
 
-            if not self.minimal:
-                t = threading.Thread(target=update_status_bar, daemon=True)
-                t.start()
+            if next_at > now:
+                await asyncio.sleep(next_at - now)
 
-            self.win.move(0, 0)
+            self.events.post("autoplay")
 
-            # Main loop. Iterates through all characters of the text
-            while self.buffer.index < len(self.text):
-                c = self.buffer.text[self.buffer.index]
-                seq = []
+    def finish_test(self):
+        self.done = True
+        self.dirty = False
+        self.stop_timer()
 
-                if self.autoplay:
-                    time.sleep(0.1)
-                else:
-                    try:
-                        c = self.win.get_wch()
-                        seq.append(c)
+        if self.remote is not None:
+            try:
+                self.remote_result = self.remote.result()
+            except client.ERRORS as err:
+                self.remote_result = None
+                self.log(f"No result from the server: {err}")
 
-                        if c == '\x1b':
-                            c2 = self.win.get_wch()
+        for task in (self.status_task, self.autoplay_task):
+            if task is not None:
+                task.cancel()
 
-                            if c2 != -1:
-                                seq.append(c2)
-                    except curses.error:
-                        continue
+        if not self.minimal:
+            self.render_status_bar()
 
-                # Esc + Del?
-                if seq == ['\x1b', '\x7f']:
-                    self.buffer.delete_word()
-                elif c != curses.KEY_RESIZE:
-                    self.buffer.compute(c)
+        self.win.erase()
+        self.refresh(self.win, self.buffer.scroll_pos(), 0, self.buffer_y, self.buffer_x, self.buffer_height + self.y, self.buffer_width + self.x)
 
-                    if self.waiting:
-                        self.start_timer()
-                        self.waiting = False
+        if self.minimal:
+            return
 
-                with self.screen_lock:
-                    self.print_rendered_text(self.win)
+        self.create_result_win()
+        self.render_result()
+        self.render_result_menu()
 
-            self.done = True
-            self.stop_timer()
+    def retry(self):
+        self.buffer.reset()
 
-            self.win.clear()
-            self.win.refresh(self.buffer.scroll_pos(), 0, self.buffer_y, self.buffer_x, self.buffer_height + self.y, self.buffer_width + self.x)
+        if self.remote is not None:
+            self.remote.retry()
+        self.waiting = True
+        self.done = False
+
+        del self.result_win
+        self.outer.erase()
+        self.outer.box()
+        self.refresh(self.outer)
+        self.result_menu_option = 0
+
+        self.start_test()
 
-            if self.minimal:
+    def read_keys(self):
+        window = self.result_win if self.done else self.win
+        keys = []
+
+        while True:
+            try:
+                keys.append(window.get_wch())
+            except curses.error:
                 break
 
-            self.result_win = self.outer.derwin(self.buffer_height, self.buffer_width, 1, 2)
-            self.result_win.keypad(True)
+        # Group escape sequences (e.g. Esc + Del) with the key that follows
+        sequences = []
+        idx = 0
 
-            self.render_result()
-            self.render_result_menu()
+        while idx < len(keys):
+            if keys[idx] == '\x1b' and idx + 1 < len(keys):
+                sequences.append(keys[idx:idx + 2])
+                idx += 2
+            else:
+                sequences.append(keys[idx:idx + 1])
+                idx += 1
 
-            selected_menu_option = self.menu_options[self.result_menu_option]
+        return sequences
 
-            if selected_menu_option == "Retry":
-                self.create_buffer()
-                self.waiting = True
-                self.done = False
+    def on_key(self, seq):
+        c = seq[0]
 
-                del self.result_win
-                self.outer.clear()
-                self.outer.box()
-                self.outer.refresh()
-                self.result_menu_option = 0
+        # Esc + Del?
+        if seq == ['\x1b', '\x7f']:
+            self.buffer.delete_word()
+            self.record_key(DELETE_WORD)
+        elif c != curses.KEY_RESIZE:
+            hit = c == self.buffer.text[self.buffer.index]
 
-                continue
-            if selected_menu_option == "Exit":
-                stop = True
-                break
+            if c != '\x7f':
+                self.live.record(time.perf_counter(), hit)
 
-            if selected_menu_option == "Next":
-                break
+                if not hit:
+                    self.missed.append(self.buffer.index)
+
+            self.buffer.compute(c)
+
+            # Special keys never match the text, so any name longer than one
+            # character replays the same way
+            self.record_key(c if isinstance(c, str) else f"<{c}>")
+
+            if self.waiting:
+                self.start_timer()
+                self.waiting = False
+
+        self.keys_written += 1
+
+        # The text is drawn once the event queue is empty, so keys that arrive
+        # faster than we can draw them are merged in a single frame.
+        if self.dirty:
+            self.dropped_frames += 1
+        self.dirty = True
+
+        if self.buffer.index >= len(self.text):
+            self.finish_test()
+
+    # Keystrokes are also sent to the server, when connected to one
+    def record_key(self, key):
+        self.keystrokes.append((time.perf_counter(), key))
+
+        if self.remote is not None:
+            self.remote.send_key(key)
 
-        self.teardown(stdscr)
-        return stop
+    # Returns the selected option once the user presses enter
+    def on_menu_key(self, key):
+        if key in (curses.KEY_DOWN, "j") and self.result_menu_option < len(self.menu_options) - 1:
+            self.result_menu_option += 1
 
-    def start(self):
-        return wrapper(self.run)
+        elif key in (curses.KEY_UP, "k") and self.result_menu_option > 0:
+            self.result_menu_option -= 1
+
+        elif key in (curses.KEY_ENTER, "\n", "\r"):
+            return self.menu_options[self.result_menu_option]
+
+        self.render_result_menu()
+        return None
+
+    # Handles a single event. Returns True if the user chose to exit, False to
+    # go to the next test, and None while the test is still running.
+    def dispatch(self, kind, payload = None):
+        if kind == "resize":
+            self.on_resize()
+
+        elif kind == "tick":
+            self.render_status_bar()
+
+        elif kind == "autoplay":
+            # Events left over from a previous test are ignored
+            if self.autoplay and not self.done:
+                self.on_key(self.autoplay.next_keys(self.buffer))
+
+        elif kind == "input":
+            for seq in self.read_keys():
+                if not self.done:
+                    if not self.autoplay:
+                        self.on_key(seq)
+                    continue
+
+                selected_menu_option = self.on_menu_key(seq[0])
+
+                if selected_menu_option == "Retry":
+                    self.retry()
+                elif selected_menu_option == "Exit":
+                    return True
+                elif selected_menu_option == "Next":
+                    return False
+
+        if self.done and self.minimal:
+            return False
+
+        if self.dirty and not self.events.pending():
+            if self.low_bandwidth:
+                self.print_changed_text(self.win)
+            else:
+                self.print_rendered_text(self.win)
+
+            self.frames += 1
+            self.dirty = False
+
+        return None
+
+    async def play(self, session):
+        self.setup(session)
+
+        # The saved layout is used if the width didn't change
+        if self.resume is not None:
+            self.resume.cache_layout(self.text)
+
+        self.render()
+
+        if self.resume is not None:
+            self.restore(self.resume)
+            self.resume = None
+
+        self.log("Initialized application")
+
+        try:
+            self.start_test()
+            self.update()
+
+            while True:
+                kind, payload = await self.events.get()
+
+                # Measuring means reading /proc twice, so it's only done when
+                # the numbers are shown
+                measure = self.debug and kind in ("input", "autoplay")
+                written = bytes_written() if measure else None
+                stop = self.dispatch(kind, payload)
+                self.update()
+
+                if written is not None:
+                    self.log_bytes_written(bytes_written() - written)
+
+                if stop is not None:
+                    return stop
+        finally:
+            for task in (self.status_task, self.autoplay_task):
+                if task is not None:
+                    task.cancel()
+
+            session.windows = (self.outer, self.win, self.status_bar, self.debug_window)
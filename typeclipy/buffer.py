@@ -1,5 +1,13 @@
 import re
 
+from typeclipy.layout import is_delimiter, layouts
+
+# How Esc + Del (delete the current word) is stored in recorded sessions
+DELETE_WORD = "\x1b\x7f"
+
+# Without a width, the text isn't laid out: there is nothing to draw, but
+# keystrokes can still be replayed (see scoring.Attempt) without going over
+# the whole text first.
 class Buffer:
     def __init__(self, text, width, height = 30, index = 0, leading_spaces = False):
         self.text = text
@@ -12,11 +20,22 @@ class Buffer:
         self.pos_y = 0
         self.rendered_text = ""
         self.highlighted = (0, 0)
-        self.positions = []
+        self.layout = None
         self.leading_spaces = leading_spaces
         self.typed = 0
-        self.render()
-        self.update_height()
+
+        if width is not None:
+            self.render()
+            self.update_height()
+
+    # Starts over with the same text. The layout doesn't change, so it's kept.
+    def reset(self):
+        self.index = 0
+        self.misses = []
+        self.miss_count = 0
+        self.typed = 0
+        self.highlighted = (0, 0)
+        self.highlight()
 
     def resize(self, width, height):
         self.width = width
@@ -31,7 +50,7 @@ class Buffer:
             self.height = max(lc, 8)
 
     def highlight(self):
-        if self.index < len(self.text):
+        if self.layout is not None and self.index < len(self.text):
             word_bounds = self.word_bounds(self.index)
 
             if self.__is_delimiter(self.text[self.index]):
@@ -41,46 +60,24 @@ class Buffer:
 
     def position(self):
         if self.index < len(self.text):
-            return self.positions[self.index]
+            return self.layout.position(self.index)
 
-        return self.positions[-1]
+        return self.layout.position(len(self.text) - 1)
 
+    # Layouts are cached, so rendering the same text at a width that was
+    # already used (e.g. on retry, or after resizing back) is free
     def render(self):
-        rendered_text = ""
-        col_index = 0
-        line_index = 0
-        text_index = 0
-
-        while text_index < len(self.text):
-            # let's calculate the position of each character, as it will not change later
-            if len(self.rendered_text) == 0:
-                self.positions.append((line_index, col_index))
-
-            # Find word
-            word_bounds = self.word_bounds(text_index)
-            remaining_word_length = word_bounds[1] - text_index
-            line_end = col_index + remaining_word_length
-
-            if text_index == self.index:
-                self.highlight()
-
-            if line_end >= self.width - 1 or self.text[text_index] == "\n":
-                col_index = 0
-                line_index += 1
-                rendered_text += "\n"
-            else:
-                col_index += 1
-                rendered_text += self.text[text_index]
+        self.layout = layouts.get(self.text, self.width, self.leading_spaces)
+        self.rendered_text = self.layout.rendered_text
 
-            text_index += 1
-
-        self.rendered_text = rendered_text
+        if self.index < len(self.text):
+            self.highlight()
 
     def line_count(self):
-        return len(self.rendered_text.split("\n"))
+        return self.layout.line_count()
 
     def curr_line(self):
-        return len(self.rendered_text[:self.index].split("\n")) - 1
+        return self.layout.line_of(self.index)
 
     def scroll_pos(self):
         current_line = self.curr_line()
@@ -97,22 +94,19 @@ class Buffer:
         return current_line + padding - screen_height
 
     def word_bounds(self, curr_index):
-        start_index = curr_index
+        if self.layout is not None:
+            return self.layout.word_bounds(curr_index)
 
-        while start_index > 0:
-            if self.__is_delimiter(self.text[start_index - 1]):
-                break
-            else:
-                start_index -= 1
+        start = curr_index
+        end = curr_index
 
-        end_index = curr_index
-        while end_index < len(self.text) - 1:
-            if self.__is_delimiter(self.text[end_index + 1]):
-                break
-            else:
-                end_index += 1
+        while start > 0 and not is_delimiter(self.text[start - 1]):
+            start -= 1
+
+        while end + 1 < len(self.text) and not is_delimiter(self.text[end + 1]):
+            end += 1
 
-        return (start_index, end_index)
+        return (start, end)
 
     def compute(self, input):
         if input == '\x7f':
@@ -0,0 +1,185 @@
+import os
+import re
+import struct
+import sys
+import zlib
+
+from array import array
+from typeclipy.layout import ARRAYS, Layout, fingerprint, layouts
+
+MAGIC = b"TCCP"
+VERSION = 1
+
+# Magic, version, text fingerprint, text length, width, leading_spaces, index,
+# miss count, typed characters and elapsed seconds
+HEADER = struct.Struct("<4sB16sQI?QQQd")
+BLOB_SIZE = struct.Struct("<Q")
+
+# Fast enough to save a multi-megabyte text when quitting
+COMPRESSION_LEVEL = 1
+
+# Where a test was left, to continue it later (see --checkpoint and --resume).
+#
+# The text itself isn't saved, only its fingerprint: the same file has to be
+# typed again. What is saved is everything that is slow to compute from it:
+# the layout at the width it was typed at, and the syntax highlighting colors,
+# one byte per character. zlib compresses the color runs and the highlighting
+# is restored without lexing the text again.
+class Checkpoint:
+    def __init__(self, text_fingerprint, text_length, width, leading_spaces, index, misses, miss_count, typed, elapsed, layout = None, colors = b""):
+        self.text_fingerprint = text_fingerprint
+        self.text_length = text_length
+        self.width = width
+        self.leading_spaces = leading_spaces
+        self.index = index
+        self.misses = misses
+        self.miss_count = miss_count
+        self.typed = typed
+        self.elapsed = elapsed
+        self.layout = layout
+        self.colors = colors
+
+    def matches(self, text):
+        return len(text) == self.text_length and fingerprint(text) == self.text_fingerprint
+
+    # Layout arrays can't be turned into a Layout without the text
+    def cache_layout(self, text):
+        if isinstance(self.layout, dict):
+            self.layout = Layout(text, self.width, self.layout)
+
+        if self.layout is not None:
+            layouts.add(text, self.width, self.leading_spaces, self.layout)
+
+def miss_bitmap(misses, length):
+    bitmap = bytearray((length + 7) // 8)
+
+    for idx in misses:
+        bitmap[idx // 8] |= 1 << (idx % 8)
+
+    return bytes(bitmap)
+
+# Only the non-zero bytes are looked at, and there are as few of those as
+# there are misses left in the text
+def misses_from_bitmap(bitmap):
+    misses = []
+
+    for match in re.finditer(rb"[^\x00]", bitmap):
+        byte = match.group()[0]
+
+        for bit in range(8):
+            if byte & (1 << bit):
+                misses.append(match.start() * 8 + bit)
+
+    return misses
+
+def int_bytes(values):
+    values = array("i", values)
+
+    if sys.byteorder == "big":
+        values.byteswap()
+
+    return values.tobytes()
+
+def int_array(data):
+    values = array("i")
+    values.frombytes(data)
+
+    if sys.byteorder == "big":
+        values.byteswap()
+
+    return values
+
+def write(path, checkpoint):
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        bytes.fromhex(checkpoint.text_fingerprint),
+        checkpoint.text_length,
+        checkpoint.width,
+        checkpoint.leading_spaces,
+        checkpoint.index,
+        checkpoint.miss_count,
+        checkpoint.typed,
+        checkpoint.elapsed
+    )
+
+    blobs = [miss_bitmap(checkpoint.misses, checkpoint.text_length), bytes(checkpoint.colors)]
+
+    if checkpoint.layout is not None:
+        blobs.extend(int_bytes(getattr(checkpoint.layout, name)) for name in ARRAYS)
+
+    # Written next to the old checkpoint first, so quitting halfway through
+    # doesn't lose it
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+
+        for blob in blobs:
+            data = zlib.compress(blob, COMPRESSION_LEVEL)
+            f.write(BLOB_SIZE.pack(len(data)))
+            f.write(data)
+
+    os.replace(tmp_path, path)
+
+# Once its test is finished, a checkpoint has nothing left to continue
+def remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def read(path):
+    with open(path, "rb") as f:
+        data = f.read()
+
+    try:
+        return parse(path, data)
+    except (struct.error, zlib.error) as err:
+        raise ValueError(f"{path} is damaged: {err}")
+
+def parse(path, data):
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a checkpoint")
+
+    magic, version, digest, text_length, width, leading_spaces, index, miss_count, typed, elapsed = HEADER.unpack_from(data)
+
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a checkpoint")
+
+    if version != VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {version}")
+
+    if index >= text_length:
+        raise ValueError(f"{path} has no text left to type")
+
+    blobs = []
+    offset = HEADER.size
+
+    while offset < len(data):
+        (size,) = BLOB_SIZE.unpack_from(data, offset)
+        offset += BLOB_SIZE.size
+        blobs.append(zlib.decompress(data[offset:offset + size]))
+        offset += size
+
+    if len(blobs) not in (2, 2 + len(ARRAYS)):
+        raise ValueError(f"{path} is incomplete")
+
+    layout = None
+
+    if len(blobs) > 2:
+        layout = {name: int_array(blob) for name, blob in zip(ARRAYS, blobs[2:])}
+
+    return Checkpoint(
+        digest.hex(),
+        text_length,
+        width,
+        leading_spaces,
+        index,
+        misses_from_bitmap(blobs[0]),
+        miss_count,
+        typed,
+        elapsed,
+        layout,
+        blobs[1]
+    )
@@ -0,0 +1,120 @@
+import getpass
+import json
+import socket
+
+from typeclipy.server import MAX_MESSAGE_SIZE
+from typeclipy.sources import Exercise, DEFAULT_TEST_COUNT, load_word_list, pick_words
+
+# Seconds to wait for a reply before giving up on the server
+TIMEOUT = 5
+
+class ServerError(Exception):
+    pass
+
+# Anything that can go wrong when talking to the server: it replied with an
+# error, went away, timed out or sent something that isn't JSON
+ERRORS = (ServerError, OSError, ValueError)
+
+# The terminal side of typeclipy-server (see typeclipy/server.py for the
+# messages). Calls block, which is fine on a local socket: keystrokes are
+# written without waiting for a reply, and the only other waits are for a new
+# exercise and for the result right after the last key.
+#
+# A test that the server didn't hand out, or stopped receiving, is still
+# played, it's just not scored by the server: `scoring` tells which is the
+# case for the current test.
+class Connection:
+    def __init__(self, path, user = None, timeout = TIMEOUT):
+        self.user = user or getpass.getuser()
+        self.scoring = False
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        self.socket.connect(path)
+        self.stream = self.socket.makefile("r", encoding="utf-8")
+
+    # The server would close the connection after a message that is too long,
+    # so a text that is too long is only played locally instead
+    def send(self, message):
+        data = json.dumps(message).encode("utf-8") + b"\n"
+
+        if len(data) > MAX_MESSAGE_SIZE:
+            raise ServerError("The message is too long for the server")
+
+        self.socket.sendall(data)
+
+    def receive(self, op):
+        line = self.stream.readline()
+
+        if not line:
+            raise ConnectionError("The server closed the connection")
+
+        message = json.loads(line)
+
+        if message["op"] == "error":
+            raise ServerError(message["message"])
+
+        if message["op"] != op:
+            raise ServerError(f"Expected {op}, got {message['op']}")
+
+        return message
+
+    def exercise(self, **options):
+        self.scoring = False
+        self.send(dict(options, op="exercise", user=self.user))
+        text = self.receive("exercise")["text"]
+        self.scoring = True
+        return text
+
+    # Falls back to `local()` for the text when the server can't be used
+    def exercise_or_local(self, local, **options):
+        try:
+            return self.exercise(**options)
+        except ERRORS:
+            return local()
+
+    def send_while_scoring(self, message):
+        if not self.scoring:
+            return
+
+        try:
+            self.send(message)
+        except OSError:
+            self.scoring = False
+
+    def send_key(self, key):
+        self.send_while_scoring({"op": "key", "key": key})
+
+    def retry(self):
+        self.send_while_scoring({"op": "retry"})
+
+    def result(self):
+        if not self.scoring:
+            raise ServerError("The server isn't scoring this test")
+
+        try:
+            return self.receive("result")
+        except ERRORS:
+            self.scoring = False
+            raise
+
+    # Without local exercises, tests come from the server's word lists.
+    # Otherwise every text is uploaded, so that the server scores it too.
+    def exercises(self, local, lang):
+        if local is None:
+            for _ in range(DEFAULT_TEST_COUNT):
+                yield Exercise("txt", lambda: self.exercise_or_local(lambda: pick_words(load_word_list(lang)), lang=lang))
+            return
+
+        for exercise in local:
+            leading_spaces = exercise.file_type != "txt"
+            yield Exercise(exercise.file_type, lambda exercise=exercise, leading_spaces=leading_spaces: self.upload(exercise.load(), leading_spaces), exercise.name)
+
+    def upload(self, text, leading_spaces):
+        if len(text) == 0:
+            return text
+
+        return self.exercise_or_local(lambda: text, text=text, leading_spaces=leading_spaces)
+
+    def close(self):
+        self.stream.close()
+        self.socket.close()
@@ -0,0 +1,57 @@
+import asyncio
+
+# Every source of work (key presses, timers, terminal resizes, autoplay) posts
+# an event to a single queue, and the app handles them one by one on the main
+# thread. Since events are handled in the order they were posted, nothing
+# needs a lock, and tests can drive an app by posting events themselves.
+class Events:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self.readers = []
+        self.signals = []
+        self.tasks = []
+
+    def post(self, kind, payload = None):
+        self.queue.put_nowait((kind, payload))
+
+    async def get(self):
+        return await self.queue.get()
+
+    def pending(self):
+        return not self.queue.empty()
+
+    def add_reader(self, fd, kind):
+        self.loop.add_reader(fd, self.post, kind)
+        self.readers.append(fd)
+
+    def add_signal(self, signum, kind):
+        self.loop.add_signal_handler(signum, self.post, kind)
+        self.signals.append(signum)
+
+    def every(self, interval, kind):
+        async def tick():
+            while True:
+                self.post(kind)
+                await asyncio.sleep(interval)
+
+        return self.spawn(tick())
+
+    def spawn(self, coroutine):
+        task = self.loop.create_task(coroutine)
+        self.tasks.append(task)
+        task.add_done_callback(self.tasks.remove)
+        return task
+
+    def close(self):
+        for fd in self.readers:
+            self.loop.remove_reader(fd)
+
+        for signum in self.signals:
+            self.loop.remove_signal_handler(signum)
+
+        for task in list(self.tasks):
+            task.cancel()
+
+        self.readers = []
+        self.signals = []
@@ -0,0 +1,142 @@
+import hashlib
+
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+# A layout takes about 18 bytes per character, so the default keeps up to
+# ~70 MB of layouts around
+DEFAULT_CACHE_CHARS = 4_000_000
+
+# Everything a Layout needs besides the text
+ARRAYS = ("word_starts", "word_ends", "lines", "cols", "line_starts")
+
+def fingerprint(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+def is_delimiter(value):
+    return value.isspace()
+
+# Where every character of a text goes for a given width. It only depends on
+# the text and the width, so it's computed once and shared by every Buffer
+# that types the same text at the same width.
+class Layout:
+    def __init__(self, text, width, arrays = None):
+        self.width = width
+
+        if arrays is not None:
+            self.load(text, arrays)
+        else:
+            self.compute_word_spans(text)
+            self.compute_positions(text)
+
+    # Takes the arrays of a layout that was saved before (see ARRAYS), e.g. in
+    # a checkpoint, instead of going over the text character by character
+    def load(self, text, arrays):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+        # Every line but the last one ends with a line break, in place of the
+        # character it was broken at
+        starts = self.line_starts
+        lines = [text[start:end - 1] for start, end in zip(starts, starts[1:])]
+        lines.append(text[starts[-1]:])
+        self.rendered_text = "\n".join(lines)
+
+    # word_bounds() of every index, computed in two passes instead of scanning
+    # the text around each character
+    def compute_word_spans(self, text):
+        length = len(text)
+        self.word_starts = array("i", range(length))
+        self.word_ends = array("i", range(length))
+
+        for idx in range(1, length):
+            if not is_delimiter(text[idx - 1]):
+                self.word_starts[idx] = self.word_starts[idx - 1]
+
+        for idx in range(length - 2, -1, -1):
+            if not is_delimiter(text[idx + 1]):
+                self.word_ends[idx] = self.word_ends[idx + 1]
+
+    def compute_positions(self, text):
+        rendered_text = []
+        self.lines = array("i")
+        self.cols = array("i")
+        self.line_starts = array("i", [0])
+        col_index = 0
+        line_index = 0
+
+        for text_index, char in enumerate(text):
+            self.lines.append(line_index)
+            self.cols.append(col_index)
+
+            remaining_word_length = self.word_ends[text_index] - text_index
+            line_end = col_index + remaining_word_length
+
+            if line_end >= self.width - 1 or char == "\n":
+                col_index = 0
+                line_index += 1
+                rendered_text.append("\n")
+                self.line_starts.append(text_index + 1)
+            else:
+                col_index += 1
+                rendered_text.append(char)
+
+        self.rendered_text = "".join(rendered_text)
+
+    def word_bounds(self, index):
+        return (self.word_starts[index], self.word_ends[index])
+
+    def position(self, index):
+        return (self.lines[index], self.cols[index])
+
+    def line_count(self):
+        return len(self.line_starts)
+
+    def line_of(self, index):
+        return bisect_right(self.line_starts, index) - 1
+
+# Least recently used layouts, keyed by the text fingerprint, the width and
+# leading_spaces. The cache is bounded by the total length of the texts, since
+# that is what the memory of a layout depends on: resizing the terminal while
+# typing a large file adds one layout per width. The newest layout is always
+# kept, however large it is.
+class LayoutCache:
+    def __init__(self, max_chars = DEFAULT_CACHE_CHARS):
+        self.max_chars = max_chars
+        self.chars = 0
+        self.layouts = OrderedDict()
+
+    def get(self, text, width, leading_spaces = False):
+        key = (fingerprint(text), width, leading_spaces)
+        layout = self.layouts.get(key)
+
+        if layout is not None:
+            self.layouts.move_to_end(key)
+            return layout
+
+        layout = Layout(text, width)
+        self.put(key, layout)
+        return layout
+
+    def add(self, text, width, leading_spaces, layout):
+        self.put((fingerprint(text), width, leading_spaces), layout)
+
+    def put(self, key, layout):
+        replaced = self.layouts.pop(key, None)
+
+        if replaced is not None:
+            self.chars -= len(replaced.lines)
+
+        self.layouts[key] = layout
+        self.chars += len(layout.lines)
+
+        while self.chars > self.max_chars and len(self.layouts) > 1:
+            _, evicted = self.layouts.popitem(last=False)
+            self.chars -= len(evicted.lines)
+
+    def clear(self):
+        self.layouts.clear()
+        self.chars = 0
+
+layouts = LayoutCache()
@@ -1,99 +1,195 @@
 import argparse
+import collections
+import json
 import sys
 import os
-import threading
-import random
 
+from typeclipy import checkpoint
 from typeclipy.app import App
+from typeclipy.client import Connection
+from typeclipy.ngrams import missed_bigrams
+from typeclipy.session import Session
+from typeclipy.sources import missing_paths, with_has_next, text_exercises, file_exercises, stdin_exercises, stream_exercises, word_exercises, drill_exercises
 from typeclipy.syntax_highlighting import color_list
+from typeclipy.typist import SyntheticTypist
 
-DEFAULT_WORD_LIST_LENGTH = 30
-DEFAULT_TEST_COUNT = 20
+def positive_int(value):
+    number = int(value)
 
-def pick_words(words):
-    word_list = words.split("\n")
-    res = []
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number: {value}")
 
-    while len(res) <= DEFAULT_WORD_LIST_LENGTH:
-        idx = random.randint(0, len(word_list) - 1)
-        res.append(word_list[idx])
+    return number
 
-    return " ".join(res)
+def parse_burst(value):
+    keys, pause = value.split(":")
+    return (positive_int(keys), float(pause))
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--text", nargs="+", help="The text you want to type")
-    parser.add_argument("--file", nargs="+", help="The path(s) of the .txt file(s) that contains the text that you want to type")
+    parser.add_argument("--file", nargs="+", help="The path(s) of the file(s) that contain the text that you want to type. Directories and glob patterns are expanded")
     parser.add_argument("--minimal", help="Minimalist mode", action="store_true")
     parser.add_argument("--theme", help="Application theme", choices=["warm_sunset", "ocean_breeze", "solarized_dark", "light_beige"])
     parser.add_argument("--lang", help="Word list language", choices=["pt", "en"], default="en")
     parser.add_argument("--out", default="-", help="File to save the results")
+    parser.add_argument("--low-bandwidth", action="store_true", help="Keep terminal output to a minimum, e.g. over slow SSH connections")
+    parser.add_argument("--record", help="File to append the keystrokes of each test to, to be scored later with typeclipy-score")
+    parser.add_argument("--sections", choices=["sequential", "random"], help="Split code files into one test per function or class")
+    parser.add_argument("--drill", action="store_true", help="Focus the word list tests on the letter pairs you miss the most")
+    parser.add_argument("--connect", metavar="SOCKET", help="Take the tests from, and send the keystrokes to, a typeclipy-server")
+    parser.add_argument("--checkpoint", help="File to save the progress of the current test to when quitting with Ctrl-C")
+    parser.add_argument("--resume", help="Continue the test saved with --checkpoint. The tests before it are skipped, and the progress is saved back to the same file unless --checkpoint is given")
+    parser.add_argument("--stream", action="store_true", help="Read piped text in the background and split it into successive tests")
 
     # Development flags
     parser.add_argument("--debug", action="store_true", help=argparse.SUPPRESS)
     parser.add_argument("--autoplay", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--autoplay-wpm", type=positive_int, default=120, help=argparse.SUPPRESS)
+    parser.add_argument("--autoplay-errors", type=float, default=0.0, help=argparse.SUPPRESS)
+    parser.add_argument("--autoplay-corrections", type=float, default=1.0, help=argparse.SUPPRESS)
+    parser.add_argument("--autoplay-word-delete", type=float, default=0.0, help=argparse.SUPPRESS)
+    parser.add_argument("--autoplay-burst", type=parse_burst, help=argparse.SUPPRESS)
+    parser.add_argument("--autoplay-seed", type=int, help=argparse.SUPPRESS)
 
     args = parser.parse_args()
+    resume = None
 
-    text_list = args.text or []
-    file_type_list = []
+    # The server scores every keystroke of a test, and it never saw the ones
+    # typed before the checkpoint
+    if args.resume and args.connect:
+        parser.error("--resume can't be used with --connect")
 
-    for t in text_list:
-        file_type_list.append("txt")
+    # Same for a recording: typeclipy-score would replay the text from the
+    # start with only the keystrokes typed after resuming
+    if args.resume and args.record:
+        parser.error("--resume can't be used with --record")
+
+    if args.resume:
+        try:
+            resume = checkpoint.read(args.resume)
+        except (OSError, ValueError) as err:
+            parser.error(f"can't resume: {err}")
+
+    # Files are only read when their test starts, so a wrong path would
+    # otherwise only show up in the middle of the session
+    for path in missing_paths(args.file or []):
+        parser.error(f"no such file: {path}")
+
+    misses = collections.Counter()
 
     if not sys.stdin.isatty():
-        data = sys.stdin.read()
-        text_list = [data.strip()]
-        file_type_list = ["txt"]
+        # Keep the pipe around so its content is only read when the test starts
+        pipe = os.fdopen(os.dup(sys.stdin.fileno()), "r", encoding="utf-8")
+        exercises = stream_exercises(pipe) if args.stream else stdin_exercises(pipe)
         tty = open("/dev/tty")
         os.dup2(tty.fileno(), sys.stdin.fileno())
     elif args.file:
-        text_list = []
+        exercises = file_exercises(args.file, args.sections)
+    elif args.text:
+        exercises = text_exercises(args.text)
+    elif args.connect:
+        exercises = None
+    elif args.drill:
+        exercises = drill_exercises(args.lang, misses)
+    else:
+        exercises = word_exercises(args.lang)
+
+    connection = None
+
+    if args.connect:
+        try:
+            connection = Connection(args.connect)
+        except OSError as err:
+            parser.error(f"can't connect to {args.connect}: {err}")
+
+        exercises = connection.exercises(exercises, args.lang)
+
+    reports = []
+    autoplay = None
+
+    if args.autoplay:
+        autoplay = SyntheticTypist(
+            wpm=args.autoplay_wpm,
+            error_rate=args.autoplay_errors,
+            correction_rate=args.autoplay_corrections,
+            word_delete_rate=args.autoplay_word_delete,
+            burst=args.autoplay_burst,
+            seed=args.autoplay_seed
+        )
+
+    playing = None
+    resumed = None
+
+    def apps():
+        nonlocal resume, playing, resumed
+
+        for exercise, has_next in with_has_next(exercises):
+            text = exercise.load()
+            saved = None
+
+            if len(text) == 0:
+                continue
+
+            if resume is not None:
+                if not resume.matches(text):
+                    continue
+
+                saved, resume = resume, None
+
+            playing = App(
+                text,
+                has_next=has_next,
+                minimal=args.minimal,
+                color_list=saved.colors if saved is not None else color_list(exercise.file_type, text),
+                leading_spaces=exercise.file_type != "txt",
+                debug=args.debug,
+                autoplay=autoplay,
+                low_bandwidth=args.low_bandwidth,
+                remote=connection,
+                resume=saved
+            )
 
-        for file_path in args.file:
-            with open(file_path, "r", encoding="utf-8") as f:
-                text_list.append(f.read().strip())
-                file_type_list.append(file_path.split(".")[-1])
-    elif len(text_list) == 0:
-        text_list = []
-        file = f"words_{args.lang}.txt"
+            if saved is not None:
+                resumed = playing
 
-        base_dir = os.path.dirname(__file__)
-        file_path = os.path.join(base_dir, "data", file)
+            yield playing
 
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-            for _ in range(DEFAULT_TEST_COUNT):
-                text_list.append(pick_words(content))
-                file_type_list.append("txt")
+    def on_finish(app):
+        # Keep only the report, so that finished texts can be released
+        reports.append(app.report())
+        misses.update(missed_bigrams(app.text, app.missed))
 
-    screen_lock = threading.Lock()
-    tests = []
+        if app is resumed and app.done:
+            checkpoint.remove(args.resume)
 
-    try:
-        for idx, text in enumerate(text_list):
-            app = App(
-                text,
-                has_next=(idx < len(text_list) - 1),
-                minimal=args.minimal,
-                theme=args.theme,
-                screen_lock=screen_lock,
-                color_list=color_list(file_type_list[idx], text),
-                leading_spaces=file_type_list[idx] != "txt",
-                debug=args.debug,
-                autoplay=args.autoplay
-            )
-            stop = app.start()
-            tests.append(app)
+        if args.record:
+            with open(args.record, "a", encoding="utf-8") as f:
+                print(json.dumps(app.recording()), file=f)
 
-            if stop:
-                break
+    try:
+        Session(theme=args.theme).start(apps(), on_finish)
     except KeyboardInterrupt:
-        pass
+        # Quitting from the result of the resumed test doesn't go through
+        # on_finish
+        if resumed is not None and resumed.done:
+            checkpoint.remove(args.resume)
+
+        checkpoint_path = args.checkpoint or args.resume
+        saved = playing.checkpoint() if playing is not None else None
+
+        if checkpoint_path and saved is not None:
+            checkpoint.write(checkpoint_path, saved)
+    finally:
+        if connection is not None:
+            connection.close()
+
+    if resume is not None:
+        print(f"None of the tests matches the text saved in {args.resume}", file=sys.stderr)
 
     if not args.minimal:
         output_stream = open(args.out, "w") if args.out != "-" else sys.stdout
 
-        for idx, test in enumerate(tests):
-            print(f"{test.report()}", file=output_stream)
+        for report in reports:
+            print(report, file=output_stream)
 
@@ -0,0 +1,96 @@
+# Shared by the app and the offline scorer, so both report the same numbers.
+
+def wpm(typed, duration_s):
+    if duration_s <= 0:
+        return 0
+
+    duration_min = duration_s / 60
+    return int(typed / 5 / duration_min)
+
+def accuracy(index, miss_count):
+    if index > 0:
+        return (1.0 - miss_count / index) * 100
+    return None
+
+DEFAULT_WINDOW_S = 10
+DEFAULT_RESOLUTION_S = 0.1
+
+# Smoothing factor of the instant WPM: higher values follow the last keys more
+INSTANT_SMOOTHING = 0.3
+
+# Live metrics, updated in O(1) on every keystroke.
+#
+# Keystrokes are counted in a ring of buckets of `resolution` seconds that
+# covers the last `window` seconds, and the count inside the window is kept
+# as a running sum. Memory doesn't depend on the typing speed.
+class LiveMetrics:
+    def __init__(self, window = DEFAULT_WINDOW_S, resolution = DEFAULT_RESOLUTION_S):
+        self.window = window
+        self.resolution = resolution
+        self.buckets = [0] * round(window / resolution)
+        self.bucket = None
+        self.in_window = 0
+        self.first = None
+        self.last = None
+        self.keystrokes = 0
+        self.hits = 0
+        self.instant = 0
+        self.peak = None
+
+    def advance(self, now):
+        current = int(now / self.resolution)
+
+        if self.bucket is None:
+            self.bucket = current
+            return
+
+        steps = current - self.bucket
+
+        if steps >= len(self.buckets):
+            self.buckets = [0] * len(self.buckets)
+            self.in_window = 0
+        else:
+            for step in range(1, steps + 1):
+                idx = (self.bucket + step) % len(self.buckets)
+                self.in_window -= self.buckets[idx]
+                self.buckets[idx] = 0
+
+        self.bucket = max(self.bucket, current)
+
+    def record(self, now, hit):
+        self.advance(now)
+        self.buckets[self.bucket % len(self.buckets)] += 1
+        self.in_window += 1
+        self.keystrokes += 1
+
+        if hit:
+            self.hits += 1
+
+        if self.first is None:
+            self.first = now
+        elif now > self.last:
+            instant = 60 / ((now - self.last) * 5)
+            self.instant = instant if self.instant == 0 else self.instant + INSTANT_SMOOTHING * (instant - self.instant)
+
+        self.last = now
+
+        # Only full windows count for the peak, otherwise the first couple of
+        # keys would look incredibly fast
+        if now - self.first >= self.window:
+            wpm = self.wpm(now)
+            self.peak = wpm if self.peak is None else max(self.peak, wpm)
+
+    def wpm(self, now):
+        if self.first is None:
+            return 0
+
+        self.advance(now)
+        return wpm(self.in_window, min(self.window, now - self.first))
+
+    def instant_wpm(self):
+        return int(self.instant)
+
+    def accuracy(self):
+        if self.keystrokes > 0:
+            return self.hits / self.keystrokes * 100
+        return None
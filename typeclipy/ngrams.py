@@ -0,0 +1,60 @@
+import random
+
+from array import array
+from collections import Counter
+
+NGRAM_SIZES = (2, 3)
+
+def ngrams(word, size):
+    return {word[idx:idx + size] for idx in range(len(word) - size + 1)}
+
+# Which words of a word list contain each bigram and trigram. Words are
+# referred to by their position in the list, so every posting is a compact
+# array of ints instead of a list of strings.
+class NgramIndex:
+    def __init__(self, words):
+        self.words = words
+        self.postings = {}
+
+        for word_id, word in enumerate(words):
+            for size in NGRAM_SIZES:
+                for ngram in ngrams(word.lower(), size):
+                    postings = self.postings.get(ngram)
+
+                    if postings is None:
+                        postings = self.postings[ngram] = array("i")
+
+                    postings.append(word_id)
+
+    def word_ids(self, ngram):
+        return self.postings.get(ngram.lower(), array("i"))
+
+    def words_with(self, ngram):
+        return [self.words[word_id] for word_id in self.word_ids(ngram)]
+
+# The bigrams that led to a miss: the character that was missed and the one
+# before it, when both are part of a word.
+def missed_bigrams(text, missed):
+    bigrams = Counter()
+
+    for idx in missed:
+        if idx > 0 and idx < len(text):
+            bigram = text[idx - 1:idx + 1].lower()
+
+            if bigram.isalpha():
+                bigrams[bigram] += 1
+
+    return bigrams
+
+# `length` words, each of them containing one of the `weights` n-grams, picked
+# in proportion to its weight (e.g. how many times it was missed). N-grams
+# that no word contains are ignored, and without any usable n-gram the words
+# are picked uniformly.
+def drill(index, weights, length):
+    usable = [(ngram, weight) for ngram, weight in weights.items() if weight > 0 and len(index.word_ids(ngram)) > 0]
+
+    if len(usable) == 0:
+        return [random.choice(index.words) for _ in range(length)]
+
+    picked = random.choices([ngram for ngram, _ in usable], weights=[weight for _, weight in usable], k=length)
+    return [index.words[random.choice(index.word_ids(ngram))] for ngram in picked]
@@ -0,0 +1,122 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+
+from typeclipy import metrics
+from typeclipy.buffer import Buffer, DELETE_WORD
+
+DEFAULT_CHUNK_SIZE = 256
+
+# Applies keystrokes to a Buffer the same way the app does while the user
+# types. The time of the first keystroke that isn't a deletion starts the
+# test, like in the app. The width doesn't change the score, so the text
+# isn't laid out at all.
+class Attempt:
+    def __init__(self, text, leading_spaces = False):
+        self.buffer = Buffer(text, None, leading_spaces=leading_spaces)
+        self.start = None
+        self.end = None
+
+    def finished(self):
+        return self.buffer.index >= len(self.buffer.text)
+
+    def type(self, t, key):
+        if self.finished():
+            return
+
+        if key == DELETE_WORD:
+            self.buffer.delete_word()
+        else:
+            self.buffer.compute(key)
+
+            if self.start is None:
+                self.start = t
+
+        self.end = t
+
+    def score(self):
+        duration_s = self.end - self.start if self.start is not None else 0
+        accuracy = metrics.accuracy(self.buffer.index, self.buffer.miss_count)
+
+        return {
+            "wpm": metrics.wpm(self.buffer.typed, duration_s),
+            "accuracy": round(accuracy, 2) if accuracy is not None else None,
+            "time": round(duration_s, 2),
+            "completed": self.finished()
+        }
+
+# Replays a recorded session (see App.recording)
+def replay(session):
+    attempt = Attempt(session["text"], session.get("leading_spaces", False))
+
+    for t, key in session["keys"]:
+        if attempt.finished():
+            break
+
+        attempt.type(t, key)
+
+    return attempt
+
+def score(session):
+    return replay(session).score()
+
+def score_line(numbered_line):
+    number, line = numbered_line
+
+    try:
+        session = json.loads(line)
+
+        if not isinstance(session, dict):
+            raise ValueError("A session must be a JSON object")
+
+        if not isinstance(session["text"], str):
+            raise ValueError("The text must be a string")
+
+        result = {"id": session.get("id", number)}
+        result.update(score(session))
+        return result
+    except (ValueError, KeyError, TypeError, IndexError) as err:
+        return {"id": number, "error": str(err)}
+
+def read_lines(paths):
+    number = 0
+
+    for path in paths:
+        stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+
+        try:
+            for line in stream:
+                if line.strip() != "":
+                    yield number, line
+                    number += 1
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+# Results are yielded in input order, as soon as each chunk is scored
+def score_all(lines, jobs = None, chunksize = DEFAULT_CHUNK_SIZE):
+    if jobs == 1:
+        yield from map(score_line, lines)
+        return
+
+    with multiprocessing.Pool(jobs) as pool:
+        yield from pool.imap(score_line, lines, chunksize)
+
+def main():
+    parser = argparse.ArgumentParser(description="Score recorded typing sessions (see typeclipy --record)")
+    parser.add_argument("sessions", nargs="+", help="JSON lines file(s) with one recorded session per line, or - for stdin")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_SIZE, help="Sessions sent to a worker at a time")
+    parser.add_argument("--out", default="-", help="File to save the results")
+
+    args = parser.parse_args()
+    output_stream = open(args.out, "w") if args.out != "-" else sys.stdout
+
+    try:
+        for result in score_all(read_lines(args.sessions), args.jobs, args.chunksize):
+            print(json.dumps(result), file=output_stream)
+    finally:
+        if output_stream is not sys.stdout:
+            output_stream.close()
@@ -0,0 +1,133 @@
+import re
+
+from bisect import bisect_right
+from pygments.token import Token
+from typeclipy.syntax_highlighting import LEXERS
+
+# Classes longer than this are split again at their inner definitions.
+# Functions are never split, as their body would end up in separate sections.
+MAX_SECTION_LINES = 80
+
+# Code above the first definition (imports, a class header) with fewer
+# non-blank lines than this is typed with the first definition instead of on
+# its own
+MIN_SECTION_LINES = 5
+
+# Some lexers (javascript) don't mark definition names, so we also look for
+# lines that start with one of these keywords.
+DEFINITION_KEYWORDS = ("def", "class", "function", "module")
+CONTAINER_KEYWORDS = ("class", "module")
+
+# Keywords that can come before the definition keyword, e.g. "export function"
+MODIFIER_KEYWORDS = ("export", "default", "async")
+
+class Section:
+    def __init__(self, name, start, end, line):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.line = line
+
+    @property
+    def size(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"Section({self.name!r}, {self.start}, {self.end}, {self.line})"
+
+class Line:
+    def __init__(self, indent, blank):
+        self.indent = indent
+        self.blank = blank
+        self.first = None
+        self.keyword = None
+        self.name = None
+        self.container = False
+
+    def attachable(self):
+        # Comments and decorators right above a definition belong to it
+        return not self.blank and self.first is not None and (self.first in Token.Comment or self.first in Token.Name.Decorator)
+
+def scan_lines(file_type, text):
+    line_starts = [0] + [match.end() for match in re.finditer("\n", text)]
+    lines = []
+
+    for idx, start in enumerate(line_starts):
+        end = line_starts[idx + 1] - 1 if idx + 1 < len(line_starts) else len(text)
+        content = text[start:end]
+        stripped = content.lstrip(" \t")
+        lines.append(Line(len(content) - len(stripped), stripped.strip() == ""))
+
+    for index, tok, value in LEXERS[file_type]().get_tokens_unprocessed(text):
+        if value.strip() == "":
+            continue
+
+        line = lines[bisect_right(line_starts, index) - 1]
+
+        if line.first is None:
+            line.first = tok
+            line.keyword = value if tok in Token.Keyword else None
+        elif line.keyword in MODIFIER_KEYWORDS and line.name is None:
+            line.keyword = value if tok in Token.Keyword else None
+
+        if line.name is None:
+            if tok in Token.Name.Function or tok in Token.Name.Class:
+                line.name = value
+                line.container = tok in Token.Name.Class
+            elif line.keyword in DEFINITION_KEYWORDS and tok in Token.Name:
+                line.name = value
+                line.container = line.keyword in CONTAINER_KEYWORDS
+
+    return lines, line_starts
+
+def split(lines, first, last, parent, skip = None):
+    candidates = [n for n in range(first, last) if n != skip and lines[n].name is not None and not lines[n].attachable()]
+
+    if len(candidates) == 0:
+        return [(parent, first, last)]
+
+    depth = min(lines[n].indent for n in candidates)
+    definitions = [n for n in candidates if lines[n].indent == depth]
+    starts = []
+
+    for n in definitions:
+        start = n
+        while start - 1 >= first and lines[start - 1].attachable():
+            start -= 1
+        starts.append(start)
+
+    sections = []
+    preamble = sum(1 for n in range(first, starts[0]) if not lines[n].blank)
+
+    if preamble >= MIN_SECTION_LINES:
+        sections.append((parent, first, starts[0]))
+    else:
+        starts[0] = first
+
+    for idx, start in enumerate(starts):
+        end = starts[idx + 1] if idx + 1 < len(starts) else last
+        definition = definitions[idx]
+        name = lines[definition].name if parent == "<module>" else f"{parent}.{lines[definition].name}"
+
+        if lines[definition].container and end - start > MAX_SECTION_LINES:
+            sections.extend(split(lines, start, end, name, definition))
+        else:
+            sections.append((name, start, end))
+
+    return sections
+
+def section_index(file_type, text):
+    if file_type not in LEXERS:
+        return []
+
+    lines, line_starts = scan_lines(file_type, text)
+    index = []
+
+    for name, first, last in split(lines, 0, len(lines), "<module>"):
+        start = line_starts[first]
+        end = line_starts[last] if last < len(line_starts) else len(text)
+
+        if text[start:end].strip() != "":
+            index.append(Section(name, start, end, first))
+
+    return index
@@ -0,0 +1,209 @@
+import argparse
+import asyncio
+import json
+import os
+import stat
+import sys
+import tempfile
+
+from datetime import datetime
+from typeclipy.scoring import Attempt
+from typeclipy.sources import load_word_list, pick_words
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "typeclipy.sock")
+LANGUAGES = ["en", "pt"]
+
+# Longest message a client can send, i.e. roughly the largest uploaded text.
+# Messages are decoded on the event loop shared by every session, at about
+# 10ms per MB.
+MAX_MESSAGE_SIZE = 1024 * 1024
+
+# Connections waiting to be accepted, e.g. when a whole class starts at once
+BACKLOG = 1024
+
+# Clients talk to the server with one JSON object per line:
+#
+# - {"op": "exercise", "lang": "en", "user": "..."}: a test from a word list
+# - {"op": "exercise", "text": "...", "leading_spaces": false, "user": "..."}:
+#   a test with an uploaded text
+# - {"op": "key", "key": "a"}: a keystroke of the current test
+# - {"op": "retry"}: start the current test over
+#
+# The server replies to "exercise" with {"op": "exercise", "id": ..., "text":
+# ...}, sends {"op": "result", "id": ..., "wpm": ..., ...} once the last
+# character of a test is typed and {"op": "error", "message": ...} when a
+# message can't be handled. Keystrokes get no reply, so typing costs a single
+# write per key.
+
+# One connected terminal. Keystrokes are scored as they arrive, with the time
+# at which the server received them.
+class Connection:
+    def __init__(self, server, writer):
+        self.server = server
+        self.writer = writer
+        self.loop = asyncio.get_running_loop()
+        self.user = None
+        self.exercise_id = None
+        self.text = None
+        self.leading_spaces = False
+        self.attempt = None
+
+    def send(self, message):
+        self.writer.write(json.dumps(message).encode("utf-8") + b"\n")
+
+    def receive(self, message):
+        op = message["op"]
+
+        if op == "key":
+            self.on_key(message["key"])
+        elif op == "exercise":
+            self.on_exercise(message)
+        elif op == "retry":
+            self.start()
+        else:
+            raise ValueError(f"Unknown op: {op}")
+
+    def on_exercise(self, message):
+        self.user = message.get("user", self.user)
+
+        if "text" in message:
+            text = message["text"]
+
+            if not isinstance(text, str) or len(text) == 0:
+                raise ValueError("The text must be a non-empty string")
+
+            self.text = text
+            self.leading_spaces = bool(message.get("leading_spaces", False))
+        else:
+            lang = message.get("lang", "en")
+
+            if lang not in LANGUAGES:
+                raise ValueError(f"Unknown language: {lang}")
+
+            self.text = pick_words(load_word_list(lang))
+            self.leading_spaces = False
+
+        self.exercise_id = self.server.next_exercise_id()
+        self.start()
+        self.send({"op": "exercise", "id": self.exercise_id, "text": self.text})
+
+    def on_key(self, key):
+        if self.attempt is None:
+            raise ValueError("No exercise was requested")
+
+        if not isinstance(key, str):
+            raise TypeError("Keys must be strings")
+
+        if self.attempt.finished():
+            return
+
+        self.attempt.type(self.loop.time(), key)
+
+        if self.attempt.finished():
+            result = {"id": self.exercise_id, "user": self.user}
+            result.update(self.attempt.score())
+            self.server.collect(result)
+            self.send(dict(result, op="result"))
+
+    def start(self):
+        if self.text is None:
+            raise ValueError("No exercise was requested")
+
+        self.attempt = Attempt(self.text, self.leading_spaces)
+
+# Hosts any number of typing sessions in a single process. Results of every
+# finished test are kept in `results` and written to `output_stream`.
+class Server:
+    def __init__(self, path = DEFAULT_SOCKET, output_stream = None):
+        self.path = path
+        self.output_stream = output_stream
+        self.results = []
+        self.connections = set()
+        self.exercise_count = 0
+        self.server = None
+
+    async def start(self):
+        remove_stale_socket(self.path)
+        self.server = await asyncio.start_unix_server(self.handle, path=self.path, limit=MAX_MESSAGE_SIZE, backlog=BACKLOG)
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+            remove_stale_socket(self.path)
+
+    async def serve_forever(self):
+        await self.start()
+
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    def next_exercise_id(self):
+        self.exercise_count += 1
+        return self.exercise_count
+
+    def collect(self, result):
+        result["finished_at"] = datetime.now().astimezone().isoformat()
+        self.results.append(result)
+
+        if self.output_stream is not None:
+            print(json.dumps(result), file=self.output_stream, flush=True)
+
+    async def handle(self, reader, writer):
+        connection = Connection(self, writer)
+        self.connections.add(connection)
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    connection.send({"op": "error", "message": "Message too long"})
+                    break
+
+                if not line:
+                    break
+
+                try:
+                    connection.receive(json.loads(line))
+                except (ValueError, KeyError, TypeError) as err:
+                    connection.send({"op": "error", "message": str(err)})
+
+                # Only wait for slow clients
+                if writer.transport.get_write_buffer_size() > 0:
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.discard(connection)
+            writer.close()
+
+# Only removes sockets, so a wrong --socket can't delete a regular file
+def remove_stale_socket(path):
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Host typing sessions for every terminal that connects with typeclipy --connect")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Path of the Unix socket to listen on")
+    parser.add_argument("--out", default="-", help="File to append the results to, as JSON lines")
+
+    args = parser.parse_args()
+    output_stream = open(args.out, "a") if args.out != "-" else sys.stdout
+    server = Server(args.socket, output_stream)
+
+    print(f"Listening on {args.socket}", file=sys.stderr)
+
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if output_stream is not sys.stdout:
+            output_stream.close()
@@ -0,0 +1,110 @@
+import asyncio
+import curses
+import signal
+import sys
+
+from curses import wrapper
+from typeclipy.events import Events
+
+# Owns the terminal for the whole run: curses, the colors, the event queue
+# and the windows are set up once and shared by every test, so moving to the
+# next test only redraws what changed.
+class Session:
+    def __init__(self, theme = None):
+        self.theme = theme
+        self.stdscr = None
+        self.colors = None
+        self.events = None
+        self.windows = (None, None, None, None)
+
+    def setup(self, stdscr):
+        self.stdscr = stdscr
+        curses.noecho()
+        curses.cbreak()
+        stdscr.keypad(True)
+        curses.curs_set(0)
+        self.define_colors()
+        stdscr.bkgd(" ", self.colors["background"])
+        stdscr.clear()
+        stdscr.refresh()
+
+    def define_colors(self):
+        curses.start_color()
+
+        background = 235
+        success = 70
+        primary = 250
+        danger = 160
+
+        if self.theme == "warm_sunset":
+            background = 52
+            success = 142
+            primary = 223
+            danger = 203
+        elif self.theme == "ocean_breeze":
+            background = 17
+            success = 79
+            primary = 188
+            danger = 124
+        elif self.theme == "solarized_dark":
+            background = 235
+            success = 108
+            primary = 136
+            danger = 167
+        elif self.theme == "light_beige":
+            background = 230
+            success = 28
+            primary = 58
+            danger = 160
+
+        curses.init_pair(1, success, background)
+        curses.init_pair(2, primary, danger)
+        curses.init_pair(3, background, primary)
+        curses.init_pair(4, primary, background)
+
+        self.colors = {
+            "success": curses.color_pair(1),
+            "error": curses.color_pair(2),
+            "reverse": curses.color_pair(3),
+            "background": curses.color_pair(4)
+        }
+
+        # Syntax highlighting
+        curses.init_pair(5, 12, background)
+        curses.init_pair(6, 10, background)
+        curses.init_pair(7, 13, background)
+        curses.init_pair(8, 14, background)
+        curses.init_pair(9, 9, background)
+        curses.init_pair(10, 3, background)
+        curses.init_pair(11, 5, background)
+        curses.init_pair(12, 51, background)
+
+    def teardown(self, stdscr):
+        curses.nocbreak()
+        stdscr.keypad(False)
+        curses.echo()
+
+    # Runs the apps one after the other, until the user chooses "Exit" or
+    # there are no more apps. `on_finish` is called with every finished app.
+    async def play(self, apps, on_finish):
+        self.events = Events()
+        self.events.add_reader(sys.stdin.fileno(), "input")
+        self.events.add_signal(signal.SIGWINCH, "resize")
+
+        try:
+            for app in apps:
+                stop = await app.play(self)
+                on_finish(app)
+
+                if stop:
+                    break
+        finally:
+            self.events.close()
+
+    def run(self, stdscr, apps, on_finish):
+        self.setup(stdscr)
+        asyncio.run(self.play(apps, on_finish))
+        self.teardown(stdscr)
+
+    def start(self, apps, on_finish = lambda app: None):
+        wrapper(self.run, apps, on_finish)
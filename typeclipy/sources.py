@@ -0,0 +1,264 @@
+import collections
+import functools
+import glob
+import os
+import queue
+import random
+import textwrap
+import threading
+import time
+
+from typeclipy.ngrams import NgramIndex, drill
+from typeclipy.sections import section_index
+
+DEFAULT_WORD_LIST_LENGTH = 30
+DEFAULT_TEST_COUNT = 20
+
+STREAM_CHUNK_SIZE = 500
+STREAM_QUEUE_SIZE = 64
+STREAM_CHUNKS_AHEAD = 2
+STREAM_IDLE_TIMEOUT = 0.5
+STREAM_LOOKAHEAD_TIMEOUT = 0.1
+STREAM_POLL_INTERVAL = 0.01
+
+# An exercise only knows where its text comes from. The text itself is loaded
+# when the exercise is about to be shown, so a long list of sources costs
+# nothing until the user actually gets to it.
+class Exercise:
+    def __init__(self, file_type, loader, name = None):
+        self.file_type = file_type
+        self.loader = loader
+        self.name = name
+
+    def load(self):
+        return self.loader()
+
+def with_has_next(iterable):
+    iterator = iter(iterable)
+
+    try:
+        current = next(iterator)
+    except StopIteration:
+        return
+
+    for item in iterator:
+        yield current, True
+        current = item
+
+    yield current, False
+
+def pick_words(word_list):
+    res = []
+
+    while len(res) <= DEFAULT_WORD_LIST_LENGTH:
+        idx = random.randint(0, len(word_list) - 1)
+        res.append(word_list[idx])
+
+    return " ".join(res)
+
+def file_type(file_path):
+    return file_path.split(".")[-1]
+
+def read_file(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+# Binary files, or any other file that isn't UTF-8, can't be typed. Neither
+# can files that were removed or can't be read by the time their test starts.
+# Their text is empty, so they are skipped like any other empty exercise.
+def read_text_file(file_path):
+    try:
+        return read_file(file_path)
+    except (UnicodeDecodeError, OSError):
+        return ""
+
+# Hidden files and directories (.git, .venv, ...) are left out of directories
+def expand_path(path):
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(name for name in dirs if not name.startswith("."))
+            for name in sorted(files):
+                if not name.startswith("."):
+                    yield os.path.join(root, name)
+    elif glob.has_magic(path):
+        for match in glob.iglob(path, recursive=True):
+            if os.path.isfile(match):
+                yield match
+    else:
+        yield path
+
+# Paths that would give no test at all: files that don't exist and globs
+# that match no file
+def missing_paths(paths):
+    for path in paths:
+        if glob.has_magic(path):
+            if not any(os.path.isfile(match) for match in glob.iglob(path, recursive=True)):
+                yield path
+        elif not os.path.exists(path):
+            yield path
+
+def text_exercises(texts):
+    for text in texts:
+        yield Exercise("txt", lambda text=text: text)
+
+# Serves a code file one section (function or class) at a time. `order` is
+# either "sequential" or "random".
+def section_exercises(file_path, order):
+    text = read_text_file(file_path)
+
+    if len(text) == 0:
+        return
+
+    index = section_index(file_type(file_path), text)
+
+    if len(index) == 0:
+        yield Exercise(file_type(file_path), lambda: text, file_path)
+        return
+
+    if order == "random":
+        random.shuffle(index)
+
+    for section in index:
+        yield Exercise(file_type(file_path), lambda section=section: textwrap.dedent(text[section.start:section.end]).strip("\n"), f"{file_path}:{section.name}")
+
+def file_exercises(paths, sections = None):
+    for path in paths:
+        for file_path in expand_path(path):
+            if sections is not None:
+                yield from section_exercises(file_path, sections)
+            else:
+                yield Exercise(file_type(file_path), lambda file_path=file_path: read_text_file(file_path), file_path)
+
+def stdin_exercises(stream):
+    yield Exercise("txt", lambda: stream.read().strip())
+
+# Reads a pipe in the background and cuts it into chunks of about `chunk_size`
+# characters. The queue is bounded, so a fast producer blocks until the user
+# catches up, and text is dropped as soon as the test using it is finished.
+class Stream:
+    def __init__(self, stream, chunk_size = STREAM_CHUNK_SIZE, idle_timeout = STREAM_IDLE_TIMEOUT):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.idle_timeout = idle_timeout
+        self.lines = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self.eof = False
+        self.thread = threading.Thread(target=self.read, daemon=True)
+        self.thread.start()
+
+    def read(self):
+        try:
+            while True:
+                line = self.stream.readline(self.chunk_size)
+
+                if line == "":
+                    break
+
+                self.lines.put(line)
+        finally:
+            self.eof = True
+
+    def exhausted(self):
+        return self.eof and self.lines.empty()
+
+    # Waits as long as needed for the first line. After that, the chunk is cut
+    # `idle_timeout` after its first line at the latest, so that a producer
+    # that writes slowly but steadily doesn't keep the user waiting either.
+    def next_chunk(self):
+        chunk = []
+        size = 0
+        deadline = None
+
+        while size < self.chunk_size and (deadline is None or time.monotonic() < deadline):
+            timeout = STREAM_POLL_INTERVAL
+
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+
+            try:
+                line = self.lines.get(timeout=max(timeout, 0))
+            except queue.Empty:
+                if self.exhausted():
+                    break
+                continue
+
+            chunk.append(line)
+            size += len(line)
+
+            if deadline is None and line.strip() != "":
+                deadline = time.monotonic() + self.idle_timeout
+
+        return "".join(chunk).strip()
+
+# Chunks are cut by a second thread, so the event loop never waits for the
+# producer while a test is shown. The first test waits for its text. After
+# that, to tell the previous test whether there is a next one (see
+# with_has_next), a cut chunk is waited for up to `timeout`. When the producer
+# is slower than that, the exercise takes its chunk when its test starts
+# instead. Either way, exercises take the chunks in the order they were cut.
+def stream_exercises(stream, timeout = STREAM_LOOKAHEAD_TIMEOUT):
+    stream = Stream(stream)
+    cut = queue.Queue(maxsize=STREAM_CHUNKS_AHEAD)
+    chunks = collections.deque()
+    ended = False
+
+    def cut_chunks():
+        try:
+            while not stream.exhausted():
+                chunk = stream.next_chunk()
+
+                if chunk != "":
+                    cut.put(chunk)
+        finally:
+            cut.put(None)
+
+    threading.Thread(target=cut_chunks, daemon=True).start()
+
+    def take():
+        nonlocal ended
+
+        if len(chunks) > 0:
+            return chunks.popleft()
+
+        if ended:
+            return ""
+
+        chunk = cut.get()
+        ended = chunk is None
+        return chunk or ""
+
+    first = True
+
+    while not ended:
+        try:
+            chunk = cut.get(timeout=None if first else timeout)
+            first = False
+        except queue.Empty:
+            yield Exercise("txt", take)
+            continue
+
+        if chunk is None:
+            ended = True
+            break
+
+        chunks.append(chunk)
+        yield Exercise("txt", take)
+
+# Word lists are read once per language and shared by every exercise
+@functools.lru_cache(maxsize=None)
+def load_word_list(lang):
+    file_path = os.path.join(os.path.dirname(__file__), "data", f"words_{lang}.txt")
+    return read_file(file_path).split("\n")
+
+@functools.lru_cache(maxsize=None)
+def load_word_index(lang):
+    return NgramIndex(load_word_list(lang))
+
+def word_exercises(lang, count = DEFAULT_TEST_COUNT):
+    for _ in range(count):
+        yield Exercise("txt", lambda: pick_words(load_word_list(lang)))
+
+# Word tests aimed at the bigrams in `misses`, a Counter that can keep growing
+# while the tests are played: each text is only picked when its test starts.
+def drill_exercises(lang, misses, count = DEFAULT_TEST_COUNT):
+    for _ in range(count):
+        yield Exercise("txt", lambda: " ".join(drill(load_word_index(lang), misses, DEFAULT_WORD_LIST_LENGTH)))
@@ -0,0 +1,66 @@
+import random
+
+WRONG_KEYS = "abcdefghijklmnopqrstuvwxyz"
+
+BACKSPACE = ['\x7f']
+DELETE_WORD = ['\x1b', '\x7f']
+
+# Simulates someone typing: used by --autoplay to load test the render path.
+#
+# - wpm: target speed. A word is 5 keystrokes, so 120 WPM is one key per 100ms.
+# - error_rate: chance of typing a wrong key instead of the expected one.
+# - correction_rate: chance that a wrong key gets fixed (with backspace, or by
+#   deleting the whole word with a chance of word_delete_rate).
+# - burst: (keys, pause) to type `keys` keystrokes and then stop for `pause`
+#   seconds, or None to type at a constant pace.
+class SyntheticTypist:
+    def __init__(self, wpm = 120, error_rate = 0.0, correction_rate = 1.0, word_delete_rate = 0.0, burst = None, seed = None):
+        self.wpm = wpm
+        self.error_rate = error_rate
+        self.correction_rate = correction_rate
+        self.word_delete_rate = word_delete_rate
+        self.burst = burst
+        self.random = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        self.keystrokes = 0
+        self.ignored = set()
+        self.seen = set()
+
+    def interval(self):
+        return 60 / (self.wpm * 5)
+
+    # Seconds to wait before the next keystroke
+    def delay(self):
+        self.keystrokes += 1
+        delay = self.interval()
+
+        if self.burst is not None and self.keystrokes % self.burst[0] == 0:
+            delay += self.burst[1]
+
+        return delay
+
+    def next_keys(self, buffer):
+        # Only the latest miss matters: older ones were either fixed already or
+        # left behind on purpose.
+        if len(buffer.misses) > 0:
+            miss = buffer.misses[-1]
+
+            if miss not in self.seen:
+                self.seen.add(miss)
+
+                if self.random.random() >= self.correction_rate:
+                    self.ignored.add(miss)
+
+        if len(buffer.misses) > 0 and buffer.misses[-1] not in self.ignored:
+            if self.random.random() < self.word_delete_rate:
+                return DELETE_WORD
+            return BACKSPACE
+
+        expected = buffer.text[buffer.index]
+
+        if self.random.random() < self.error_rate:
+            return [self.random.choice([c for c in WRONG_KEYS if c != expected])]
+
+        return [expected]